@@ -1,7 +1,6 @@
 import click
+import heapq
 from pathlib import Path
-from .scanner import DirectoryScanner
-from .watcher import FileWatcher
 from .config import Config
 from .gitignore import ensure_gitignore_entry
 from .defaults import (
@@ -9,9 +8,7 @@ from .defaults import (
     DEFAULT_INDEXING_ENABLED, DEFAULT_INDEXING_INCLUDE, DEFAULT_INDEXING_EXCLUDE,
     DEFAULT_INDEXING_DETAIL_LEVEL
 )
-from colorama import init, Fore, Style
-
-init()
+from .colors import Fore, Style
 
 @click.group()
 def main():
@@ -66,14 +63,20 @@ def stats():
     click.echo(f"Exclude patterns: {indexing_config.get('exclude') or []}")
 
     total_bytes = 0
-    size_entries = []
-    for file_path in files:
+    largest = []  # min-heap holding the 10 largest (size, path) pairs
+    # Already covered: get_indexable_files stats each entry for the maxFileBytes check
+    # and DirEntry caches the result, so this loop reads cached sizes without more I/O
+    for entry in files:
         try:
-            size = file_path.stat().st_size
+            size = entry.stat(follow_symlinks=True).st_size
         except OSError:
             continue
         total_bytes += size
-        size_entries.append((size, file_path))
+        item = (size, entry.path)
+        if len(largest) < 10:
+            heapq.heappush(largest, item)
+        elif item > largest[0]:
+            heapq.heapreplace(largest, item)
 
     click.echo(f"Total size: {_format_bytes(total_bytes)}")
 
@@ -85,11 +88,11 @@ def stats():
             f"(assumes {_format_bytes(estimate_bytes_per_sec)}/s)"
         )
 
-    if size_entries:
+    if largest:
         click.echo("Largest files:")
-        for size, file_path in sorted(size_entries, reverse=True)[:10]:
+        for size, file_path in sorted(largest, reverse=True):
             click.echo(
-                f"  {_format_bytes(size)}  {_safe_relative_path(file_path, config.project_root)}"
+                f"  {_format_bytes(size)}  {_safe_relative_path(Path(file_path), config.project_root)}"
             )
 
 
@@ -106,15 +109,16 @@ def _get_validated_config():
     return config
 
 
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def _format_bytes(value: int) -> str:
-    units = ["B", "KB", "MB", "GB", "TB"]
-    size = float(value)
-    for unit in units:
-        if size < 1024 or unit == units[-1]:
-            if unit == "B":
-                return f"{int(size)} {unit}"
-            return f"{size:.2f} {unit}"
-        size /= 1024
+    value = int(value)
+    # Each unit spans 10 bits, so the bit length picks the unit directly
+    exponent = max(0, min((value.bit_length() - 1) // 10, len(_BYTE_UNITS) - 1))
+    if exponent == 0:
+        return f"{value} B"
+    return f"{value / (1 << (10 * exponent)):.2f} {_BYTE_UNITS[exponent]}"
 
 
 def _safe_relative_path(path: Path, root: Path) -> str:
@@ -124,20 +128,6 @@ def _safe_relative_path(path: Path, root: Path) -> str:
         return str(path).replace("\\", "/")
 
 
-def _generate_initial_outputs(config):
-    """Generate both file structure and codebase index"""
-    scanner = DirectoryScanner(config)
-    scanner.scan_and_generate()
-    click.echo(f"{Fore.GREEN}Directory structure generated!{Style.RESET_ALL}")
-
-    indexing_config = config.get_indexing_config()
-    if indexing_config['enabled']:
-        from .indexer import CodebaseIndexer
-        indexer = CodebaseIndexer(config)
-        indexer.index_and_generate()
-        click.echo(f"{Fore.GREEN}Codebase index generated!{Style.RESET_ALL}")
-
-
 def _configure_settings(config):
     """Configure all Twiggy settings including indexing"""
     click.echo(f"\n{Fore.YELLOW}Setting up Twiggy{Style.RESET_ALL}")
@@ -241,6 +231,8 @@ def _display_added_excludes(excludes):
 
 
 def _start_file_watcher(config):
+    from .watcher import FileWatcher
+
     try:
         watcher = FileWatcher(config)
         click.echo(f"{Fore.GREEN}Watching for changes... (Press Ctrl+C to stop){Style.RESET_ALL}")
@@ -0,0 +1,21 @@
+"""
+Colors - Terminal colors for status output.
+Escape codes are only emitted when stdout is a terminal, so piped or logged output stays plain.
+"""
+
+import sys
+
+if sys.stdout.isatty():
+    from colorama import Fore, Style, just_fix_windows_console
+
+    # Enables ANSI handling on older Windows consoles once, instead of wrapping stdout
+    just_fix_windows_console()
+else:
+    class _NoColor:
+        """Stand-in for colorama's Fore/Style when output is piped: every color is ''"""
+
+        def __getattr__(self, name):
+            return ''
+
+    # Skip colorama's escape codes entirely
+    Fore = Style = _NoColor()
@@ -1,32 +1,305 @@
-import yaml
 import os
+import re
+import json
+import mmap
 import fnmatch
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Optional, Pattern, Tuple, Union
 from importlib import resources
 from .defaults import (
     DEFAULT_INDEXING_DETAIL_LEVEL,
     DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC,
+    DEFAULT_INDEXING_MAX_FILE_BYTES,
+    DEFAULT_INDEXING_PARSE_TIMEOUT_MS,
+    DEFAULT_INDEXING_USE_DEFAULT_IGNORES,
 )
+from .pathtrie import PathTrie, partition_gitignore_lines
+
+if TYPE_CHECKING:
+    import pathspec
+
+
+_DEFAULT_IGNORES = frozenset({
+    'node_modules', '.next', '.nuxt', 'dist', 'build', '.output', '.vercel', '.netlify', 'out', '.cache',
+    '.parcel-cache', '.webpack', 'coverage', '.nyc_output', '.jest',
+    '__pycache__', '.pytest_cache', '.mypy_cache', '.tox', 'venv', 'env', '.venv', '.env', 'site-packages',
+    '.coverage', 'htmlcov', '*.egg-info', '.eggs',
+    'target', 'Cargo.lock', 'vendor', '.gradle', '.idea', '.vs', 'cmake-build-debug', 'cmake-build-release',
+    '.bundle', '.vscode', '.vscode-test', '.git', '.svn', '.hg', '.bzr', '.DS_Store', 'Thumbs.db', '.Trash',
+    'logs', 'log', 'tmp', 'temp', '.tmp', '.temp', '_site', '.docusaurus', 'public', 'docs/_build',
+    'ios/build', 'android/build', '.expo', '*.db', '*.sqlite', '*.sqlite3', '.docker', '.terraform',
+    '.serverless', '.yarn', '.pnpm-store', '.rush', '.playwright', 'cypress/videos', 'cypress/screenshots',
+    'test-results', '.sass-cache', '.postcssrc', '.eslintcache', '.stylelintcache', '.github', '.husky'
+})
+
+_INDEXING_DEFAULT_IGNORES = frozenset({
+    # Test files
+    '*.test.ts', '*.test.tsx', '*.test.js', '*.test.jsx',
+    '*.spec.ts', '*.spec.tsx', '*.spec.js', '*.spec.jsx',
+    '__tests__', '__mocks__', 'test', 'tests',
+    '*.test.mjs', '*.test.cjs', '*.spec.mjs', '*.spec.cjs',
+
+    # Build outputs and dependencies
+    'node_modules', '.next', '.nuxt', 'dist', 'build', '.output',
+    '.vercel', '.netlify', 'out', '.cache', '.parcel-cache',
+    '.webpack', 'coverage', '.nyc_output', '.turbo',
+
+    # Config files
+    '*.config.ts', '*.config.js', '*.config.mjs', '*.config.cjs',
+    'vite.config.*', 'next.config.*', 'nuxt.config.*',
+    'tailwind.config.*', 'postcss.config.*', 'jest.config.*',
+    'vitest.config.*', 'webpack.config.*', 'rollup.config.*',
+    'babel.config.*', 'eslint.config.*', 'prettier.config.*',
+    'tsconfig.json', 'jsconfig.json', 'package.json',
+
+    # Declaration files (already type definitions)
+    '*.d.ts',
+
+    # Minified and bundled output
+    '*.min.js', '*.bundle.js',
+
+    # Generated files
+    '*.generated.ts', '*.generated.js',
+    'generated', 'codegen', '.codegen',
+
+    # Storybook
+    '*.stories.ts', '*.stories.tsx', '*.stories.js', '*.stories.jsx',
+    '.storybook',
+
+    # E2E tests
+    'e2e', 'cypress', 'playwright',
+
+    # Scripts and tooling
+    'scripts', 'tools', 'bin',
+
+    # Migrations and seeds
+    'migrations', 'seeds', 'fixtures',
+
+    # Public assets
+    'public', 'static', 'assets',
+
+    # Version control and IDE
+    '.git', '.svn', '.hg', '.idea', '.vscode',
+
+    # Temporary files
+    'tmp', 'temp', '.tmp', '.temp',
+})
+
+
+def _normalize_pattern(pattern) -> str:
+    """Normalize a user pattern to forward slashes once, at matcher build time"""
+    return str(pattern).replace('\\', '/')
+
+
+def _is_glob(pattern: str) -> bool:
+    return '*' in pattern or '?' in pattern or '[' in pattern
+
+
+@lru_cache(maxsize=None)
+def _translate_glob(pattern: str) -> str:
+    return f'(?:{fnmatch.translate(pattern)})'
+
+
+def _compile_globs(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Compile glob patterns into a single alternation regex (None if empty)"""
+    translated = [_translate_glob(pattern) for pattern in sorted(patterns)]
+    if not translated:
+        return None
+    return re.compile('|'.join(translated))
+
+
+@dataclass(frozen=True)
+class _PatternSet:
+    """Indexing patterns split into literal names, literal paths, and one glob regex"""
+
+    names: FrozenSet[str]
+    paths: FrozenSet[str]
+    regex: Optional[Pattern]
+
+    @classmethod
+    def build(cls, patterns: Iterable[str]) -> '_PatternSet':
+        names, paths, globs = set(), set(), set()
+        for pattern in patterns:
+            pattern = _normalize_pattern(pattern)
+            if _is_glob(pattern):
+                globs.add(pattern)
+            else:
+                (paths if '/' in pattern else names).add(pattern)
+        return cls(frozenset(names), frozenset(paths), _compile_globs(globs))
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.paths or self.regex)
+
+    def matches(self, path: str, filename: str, path_parts: List[str]) -> bool:
+        """Check path, filename and components, cheapest test first"""
+        if not self.names.isdisjoint(path_parts):
+            return True
+        if path in self.paths:
+            return True
+        return bool(self.regex and (self.regex.match(path) or self.regex.match(filename)))
+
+
+@lru_cache(maxsize=1)
+def _indexing_default_patterns() -> _PatternSet:
+    return _PatternSet.build(_INDEXING_DEFAULT_IGNORES)
+
+
+# Bump when _parse_config's output changes. The defaults it fills in are part of the
+# key as well, so an upgrade that changes one doesn't keep serving the cached old value
+_CONFIG_CACHE_VERSION = 1
+_CONFIG_CACHE_KEY = [
+    _CONFIG_CACHE_VERSION,
+    DEFAULT_INDEXING_DETAIL_LEVEL,
+    DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC,
+    DEFAULT_INDEXING_MAX_FILE_BYTES,
+    DEFAULT_INDEXING_PARSE_TIMEOUT_MS,
+    DEFAULT_INDEXING_USE_DEFAULT_IGNORES,
+]
+
+
+# Non-empty, non-comment .gitignore lines; git only treats '#' in column 0 as a comment
+_GITIGNORE_LINE_RE = re.compile(rb'^[^#\r\n][^\r\n]*', re.MULTILINE)
+
+
+@lru_cache(maxsize=1)
+def _yaml_safe_loader():
+    """libyaml-backed safe loader when PyYAML was built with it, else the pure-Python one"""
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+    return loader
+
+
+def _relative_to_root(path, root_str: str):
+    """Return (posix path relative to root_str, whether it is under the root)"""
+    path_str = str(path)
+    if os.sep == '\\':
+        path_str = path_str.replace('\\', '/')
+
+    root_prefix = root_str + '/'
+    if path_str.startswith(root_prefix):
+        return path_str[len(root_prefix):], True
+    if path_str == root_str:
+        return '.', True
+    return path_str, False
+
+
+@dataclass(frozen=True)
+class IgnoreMatcher:
+    """Immutable snapshot of the structure ignores for one config/.gitignore generation
+
+    Safe to share across threads and picklable for worker processes; callers
+    should fetch it once per traversal via Config.get_ignore_matcher().
+    """
+
+    root: str
+    names: FrozenSet[str]
+    paths: FrozenSet[str]
+    name_regex: Optional[Pattern]
+    path_regex: Optional[Pattern]
+    gitignore_spec: Optional['pathspec.PathSpec'] = None
+    # Literal .gitignore rules, checked by walking the path once instead of by pathspec
+    gitignore_trie: Optional[PathTrie] = None
+
+    @classmethod
+    def build(cls, root: str, ignores: Iterable[str],
+              gitignore_spec: Optional['pathspec.PathSpec'] = None,
+              gitignore_trie: Optional[PathTrie] = None) -> 'IgnoreMatcher':
+        """Partition ignores into literal names, literal paths, and glob regexes"""
+        names, paths, name_globs, path_globs = set(), set(), set(), set()
+        for ignore in ignores:
+            ignore = _normalize_pattern(ignore)
+            if _is_glob(ignore):
+                (path_globs if '/' in ignore else name_globs).add(ignore)
+            else:
+                (paths if '/' in ignore else names).add(ignore)
+
+        return cls(root, frozenset(names), frozenset(paths),
+                   _compile_globs(name_globs), _compile_globs(path_globs), gitignore_spec,
+                   gitignore_trie or None)
+
+    def should_prune_dir(self, dirname: str) -> bool:
+        """Fast check whether a directory can be skipped by its name alone"""
+        if dirname in self.names:
+            return True
+        return bool(self.name_regex and self.name_regex.match(dirname))
+
+    def should_ignore(self, path: Union[str, Path]) -> bool:
+        return self.match(*_relative_to_root(path, self.root))
+
+    def match(self, relative_path_str: str, inside_root: bool = True) -> bool:
+        """Check a posix path relative to the project root"""
+        path_parts = relative_path_str.split('/')
+
+        # Bare names match any path component
+        if not self.names.isdisjoint(path_parts):
+            return True
+
+        # Literal paths match the path itself or any of its parent directories
+        if self.paths:
+            prefix = ''
+            for part in path_parts:
+                prefix = f'{prefix}/{part}' if prefix else part
+                if prefix in self.paths:
+                    return True
+
+        if self.name_regex and any(self.name_regex.match(part) for part in path_parts):
+            return True
+
+        if self.path_regex and self.path_regex.match(relative_path_str):
+            return True
+
+        if not inside_root:
+            return False
+
+        trie = self.gitignore_trie
+        if trie and trie.match(path_parts):
+            return True
+
+        # Directory-only gitignore rules ('build/') need the trailing slash
+        spec = self.gitignore_spec
+        if spec:
+            return spec.match_file(relative_path_str) or spec.match_file(relative_path_str + '/')
+
+        return False
+
 
 class Config:
     def __init__(self, project_root: Path):
         self.project_root = project_root
         self.config_file = project_root / 'twiggy.yml'
+        self.gitignore_file = project_root / '.gitignore'
+        self.cache_file = project_root / '.cursor' / '.twiggy-cache.json'
+        self.index_cache_file = project_root / '.cursor' / '.twiggy-cache.sqlite'
+
+        root_str = str(project_root)
+        if os.sep == '\\':
+            root_str = root_str.replace('\\', '/')
+        self._root_str = root_str.rstrip('/')
+
+        # Parsed config and derived ignore sets, invalidated by file stamp. The watcher's
+        # threads share this Config: rebuilds are serialized and publish their key last,
+        # so a reader that sees the new key also sees the matchers built for it
+        self._rebuild_lock = threading.Lock()
+        self._config_stamp = None
+        self._cached_config = None
+        self._gitignore_stamp = None
+        self._cached_gitignore: Tuple[Optional[PathTrie], Optional['pathspec.PathSpec']] = (None, None)
+        self._ignores_key = None
+        self._cached_ignores = None
+        self._ignore_matcher = IgnoreMatcher.build(self._root_str, ())
+        self._indexing_key = None
+        self._cached_indexing_config = None
+        self._index_default_patterns = _PatternSet.build(())
+        self._index_exclude_patterns = _PatternSet.build(())
+        self._index_include_patterns = _PatternSet.build(())
     
-    def get_default_ignores(self) -> Set[str]:
-        return {
-            'node_modules', '.next', '.nuxt', 'dist', 'build', '.output', '.vercel', '.netlify', 'out', '.cache',
-            '.parcel-cache', '.webpack', 'coverage', '.nyc_output', '.jest',
-            '__pycache__', '.pytest_cache', '.mypy_cache', '.tox', 'venv', 'env', '.venv', '.env', 'site-packages',
-            '.coverage', 'htmlcov', '*.egg-info', '.eggs',
-            'target', 'Cargo.lock', 'vendor', '.gradle', '.idea', '.vs', 'cmake-build-debug', 'cmake-build-release',
-            '.bundle', '.vscode', '.vscode-test', '.git', '.svn', '.hg', '.bzr', '.DS_Store', 'Thumbs.db', '.Trash',
-            'logs', 'log', 'tmp', 'temp', '.tmp', '.temp', '_site', '.docusaurus', 'public', 'docs/_build',
-            'ios/build', 'android/build', '.expo', '*.db', '*.sqlite', '*.sqlite3', '.docker', '.terraform',
-            '.serverless', '.yarn', '.pnpm-store', '.rush', '.playwright', 'cypress/videos', 'cypress/screenshots',
-            'test-results', '.sass-cache', '.postcssrc', '.eslintcache', '.stylelintcache', '.github', '.husky'
-        }
+    def get_default_ignores(self) -> FrozenSet[str]:
+        return _DEFAULT_IGNORES
     
     def exists(self) -> bool:
         return self.config_file.exists()
@@ -56,6 +329,7 @@ class Config:
                 "  enabled: {indexing_enabled}\n"
                 "  include: {indexing_include}\n"
                 "  exclude:\n{indexing_exclude}\n"
+                "  useDefaultIgnores: true\n"
                 "  detailLevel: {indexing_detail_level}\n"
             )
 
@@ -71,6 +345,9 @@ class Config:
 
         with open(self.config_file, 'w', encoding='utf-8') as f:
             f.write(config_content)
+
+        # Parse once now so the JSON shadow cache is written alongside
+        self.load()
     
     def _format_list_inline(self, items: List[str]) -> str:
         """Format a list as inline YAML array"""
@@ -84,13 +361,66 @@ class Config:
             return '    # - "*.example.ts"'
         return '\n'.join(f'    - "{exclude}"' for exclude in excludes)
     
+    def _file_stamp(self, path: Path):
+        """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     def load(self) -> dict:
-        if not self.exists():
+        stamp = self._file_stamp(self.config_file)
+        if stamp is None:
+            self._config_stamp = None
+            self._cached_config = None
             return {}
 
+        if self._cached_config is not None and stamp == self._config_stamp:
+            return self._cached_config
+
+        config = self._load_cached_json(stamp)
+        if config is None:
+            config = self._parse_config()
+            if config:
+                self._save_cached_json(stamp, config)
+
+        self._cached_config = config
+        self._config_stamp = stamp
+        return config
+
+    def _load_cached_json(self, stamp) -> Optional[dict]:
+        """Return the parsed config from the JSON shadow cache if twiggy.yml is unchanged"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (not isinstance(cached, dict) or cached.get('source') != list(stamp) or
+                cached.get('version') != _CONFIG_CACHE_KEY):
+            return None
+        return cached.get('config') or None
+
+    def _save_cached_json(self, stamp, config: dict):
+        """Persist the parsed config next to twiggy.yml's stamp (skipped before init)"""
+        if not self.cache_file.parent.is_dir():
+            return
+
+        tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'source': list(stamp), 'version': _CONFIG_CACHE_KEY, 'config': config}, f)
+            os.replace(tmp_file, self.cache_file)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _parse_config(self) -> dict:
+        import yaml
+
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f) or {}
+                config = yaml.load(f, Loader=_yaml_safe_loader()) or {}
 
             structure = config.get('structure', {})
             indexing = config.get('indexing', {})
@@ -108,197 +438,181 @@ class Config:
                     'enabled': indexing.get('enabled', True),
                     'include': indexing.get('include', []) or [],
                     'exclude': indexing.get('exclude', []) or [],
+                    'useDefaultIgnores': indexing.get(
+                        'useDefaultIgnores', DEFAULT_INDEXING_USE_DEFAULT_IGNORES
+                    ),
                     'detailLevel': detail_level,
                     'estimateBytesPerSec': indexing.get(
                         'estimateBytesPerSec', DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC
                     ),
+                    'maxFileBytes': indexing.get(
+                        'maxFileBytes', DEFAULT_INDEXING_MAX_FILE_BYTES
+                    ),
+                    'parseTimeoutMs': indexing.get(
+                        'parseTimeoutMs', DEFAULT_INDEXING_PARSE_TIMEOUT_MS
+                    ),
                 }
             }
         except Exception:
             return {}
     
-    def get_ignores(self) -> Set[str]:
+    def get_ignores(self) -> FrozenSet[str]:
+        key = self._ignores_inputs()
+        if self._cached_ignores is not None and key == self._ignores_key:
+            return self._cached_ignores
+
+        with self._rebuild_lock:
+            # Re-read under the lock, so a rebuild never publishes inputs older than the last one
+            key = self._ignores_inputs()
+            if self._cached_ignores is not None and key == self._ignores_key:
+                return self._cached_ignores
+
+            config, (gitignore_trie, gitignore_spec) = key
+            all_ignores = set(self.get_default_ignores())
+
+            structure_exclude = config.get('structure', {}).get('exclude', []) or []
+            all_ignores.update(structure_exclude)
+            all_ignores.add('.cursor/rules/file-structure.mdc')
+
+            ignores = frozenset(all_ignores)
+            self._ignore_matcher = IgnoreMatcher.build(self._root_str, ignores,
+                                                      gitignore_spec, gitignore_trie)
+            self._cached_ignores = ignores
+            self._ignores_key = key
+            return ignores
+
+    def _ignores_inputs(self):
+        """(parsed config, gitignore trie and spec); the objects themselves key the derived ignores"""
         config = self.load()
-        all_ignores = set(self.get_default_ignores())
-
-        structure_exclude = config.get('structure', {}).get('exclude', []) or []
-        all_ignores.update(structure_exclude)
-        
-        if config.get('syncWithGitignore', True):
-            gitignore_patterns = self._load_gitignore()
-            all_ignores.update(gitignore_patterns)
-        
-        all_ignores.add('.cursor/rules/file-structure.mdc')
-        
-        return all_ignores
+        sync_gitignore = config.get('syncWithGitignore', True)
+        return config, self._load_gitignore() if sync_gitignore else (None, None)
+
+    def get_ignore_matcher(self) -> IgnoreMatcher:
+        """Current ignore matcher, rebuilt only when twiggy.yml or .gitignore changes"""
+        self.get_ignores()
+        return self._ignore_matcher
     
-    def _load_gitignore(self) -> Set[str]:
-        gitignore_file = self.project_root / '.gitignore'
-        if not gitignore_file.exists():
-            return set()
-        
-        patterns = set()
+    def _load_gitignore(self) -> Tuple[Optional[PathTrie], Optional['pathspec.PathSpec']]:
+        """Split .gitignore into a trie of literal paths and a pathspec of the wildmatch rules"""
+        stamp = self._file_stamp(self.gitignore_file)
+        if stamp is None or stamp == self._gitignore_stamp:
+            self._gitignore_stamp = stamp
+            return self._cached_gitignore if stamp is not None else (None, None)
+
+        import pathspec
+
+        trie, spec = None, None
         try:
-            with open(gitignore_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        clean_pattern = line.strip('/*')
-                        if clean_pattern:
-                            patterns.add(clean_pattern)
+            # mmap rejects empty files
+            if stamp[1] == 0:
+                lines = []
+            else:
+                with open(self.gitignore_file, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    lines = _GITIGNORE_LINE_RE.findall(mm)
+            trie, remaining = partition_gitignore_lines(
+                line.decode('utf-8', 'replace') for line in lines
+            )
+            if remaining:
+                spec = pathspec.GitIgnoreSpec.from_lines(remaining)
         except Exception:
             pass
-        
-        return patterns
-    
-    def should_ignore(self, path: Path) -> bool:
-        ignores = self.get_ignores()
-
-        try:
-            relative_path = path.relative_to(self.project_root)
-            relative_path_str = str(relative_path).replace('\\', '/')
-        except ValueError:
-            relative_path_str = str(path).replace('\\', '/')
-
-        for ignore in ignores:
-            ignore = ignore.replace('\\', '/')
-
-            if relative_path_str == ignore:
-                return True
 
-            if relative_path_str.startswith(ignore + '/'):
-                return True
+        self._cached_gitignore = (trie, spec)
+        self._gitignore_stamp = stamp
+        return self._cached_gitignore
+    
+    def should_prune_dir(self, dirname: str) -> bool:
+        """Fast check whether a directory can be skipped by its name alone"""
+        return self.get_ignore_matcher().should_prune_dir(dirname)
 
-            if '/' not in ignore:
-                path_parts = relative_path_str.split('/')
-                if ignore in path_parts:
-                    return True
+    def _relative_path_str(self, path: Union[str, Path]):
+        """Return (posix path relative to the project root, whether it is under the root)"""
+        return _relative_to_root(path, self._root_str)
 
-        return False
+    def should_ignore(self, path: Union[str, Path]) -> bool:
+        return self.get_ignore_matcher().should_ignore(path)
 
-    def get_indexing_default_ignores(self) -> Set[str]:
+    def get_indexing_default_ignores(self) -> FrozenSet[str]:
         """Default ignores specifically for the indexer"""
-        return {
-            # Test files
-            '*.test.ts', '*.test.tsx', '*.test.js', '*.test.jsx',
-            '*.spec.ts', '*.spec.tsx', '*.spec.js', '*.spec.jsx',
-            '__tests__', '__mocks__', 'test', 'tests',
-            '*.test.mjs', '*.test.cjs', '*.spec.mjs', '*.spec.cjs',
-
-            # Build outputs and dependencies
-            'node_modules', '.next', '.nuxt', 'dist', 'build', '.output',
-            '.vercel', '.netlify', 'out', '.cache', '.parcel-cache',
-            '.webpack', 'coverage', '.nyc_output', '.turbo',
-
-            # Config files
-            '*.config.ts', '*.config.js', '*.config.mjs', '*.config.cjs',
-            'vite.config.*', 'next.config.*', 'nuxt.config.*',
-            'tailwind.config.*', 'postcss.config.*', 'jest.config.*',
-            'vitest.config.*', 'webpack.config.*', 'rollup.config.*',
-            'babel.config.*', 'eslint.config.*', 'prettier.config.*',
-            'tsconfig.json', 'jsconfig.json', 'package.json',
-
-            # Declaration files (already type definitions)
-            '*.d.ts',
-
-            # Generated files
-            '*.generated.ts', '*.generated.js',
-            'generated', 'codegen', '.codegen',
-
-            # Storybook
-            '*.stories.ts', '*.stories.tsx', '*.stories.js', '*.stories.jsx',
-            '.storybook',
-
-            # E2E tests
-            'e2e', 'cypress', 'playwright',
-
-            # Scripts and tooling
-            'scripts', 'tools', 'bin',
-
-            # Migrations and seeds
-            'migrations', 'seeds', 'fixtures',
-
-            # Public assets
-            'public', 'static', 'assets',
-
-            # Version control and IDE
-            '.git', '.svn', '.hg', '.idea', '.vscode',
-
-            # Temporary files
-            'tmp', 'temp', '.tmp', '.temp',
-        }
+        return _INDEXING_DEFAULT_IGNORES
 
     def get_indexing_config(self) -> dict:
         """Get indexing-specific configuration"""
         config = self.load()
-        indexing = config.get('indexing', {})
+        if self._cached_indexing_config is not None and config == self._indexing_key:
+            return self._cached_indexing_config
+
+        with self._rebuild_lock:
+            config = self.load()
+            if self._cached_indexing_config is not None and config == self._indexing_key:
+                return self._cached_indexing_config
+            return self._build_indexing_config(config)
 
-        return {
+    def _build_indexing_config(self, config: dict) -> dict:
+        indexing = config.get('indexing', {})
+        indexing_config = {
             'enabled': indexing.get('enabled', True),
             'include': indexing.get('include', []),
             'exclude': indexing.get('exclude', []),
+            'useDefaultIgnores': indexing.get(
+                'useDefaultIgnores', DEFAULT_INDEXING_USE_DEFAULT_IGNORES
+            ),
             'detailLevel': self._normalize_indexing_detail_level(
                 indexing.get('detailLevel', DEFAULT_INDEXING_DETAIL_LEVEL)
             ),
             'estimateBytesPerSec': indexing.get(
                 'estimateBytesPerSec', DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC
             ),
+            'maxFileBytes': indexing.get('maxFileBytes', DEFAULT_INDEXING_MAX_FILE_BYTES),
+            'parseTimeoutMs': indexing.get('parseTimeoutMs', DEFAULT_INDEXING_PARSE_TIMEOUT_MS),
         }
+        # With useDefaultIgnores off the built-in set is never consulted
+        if indexing_config['useDefaultIgnores']:
+            self._index_default_patterns = _indexing_default_patterns()
+        else:
+            self._index_default_patterns = _PatternSet.build(())
+        self._index_exclude_patterns = _PatternSet.build(indexing_config['exclude'])
+        self._index_include_patterns = _PatternSet.build(indexing_config['include'])
+        self._cached_indexing_config = indexing_config
+        self._indexing_key = config
+        return indexing_config
+
+    def get_indexing_prune_names(self) -> FrozenSet[str]:
+        """Bare-name indexing ignores; a directory with one of these names holds nothing indexable"""
+        self.get_indexing_config()
+        return self._index_default_patterns.names | self._index_exclude_patterns.names
 
     def _normalize_indexing_detail_level(self, detail_level: str) -> str:
         if detail_level in {'full', 'compact'}:
             return detail_level
         return DEFAULT_INDEXING_DETAIL_LEVEL
 
-    def should_index_file(self, path: Path) -> bool:
-        """Determine if a file should be indexed"""
+    def should_index_file(self, path: Union[str, Path]) -> bool:
+        """Determine if a file should be indexed (path may be a Path or a plain string)"""
         indexing_config = self.get_indexing_config()
 
         if not indexing_config['enabled']:
             return False
 
-        try:
-            relative_path = path.relative_to(self.project_root)
-            relative_path_str = str(relative_path).replace('\\', '/')
-        except ValueError:
-            relative_path_str = str(path).replace('\\', '/')
-
-        filename = path.name
+        relative_path_str, inside_root = self._relative_path_str(path)
+        filename = os.path.basename(path)
+        path_parts = relative_path_str.split('/')
 
         # Check against structure ignores first
-        if self.should_ignore(path):
+        if self.get_ignore_matcher().match(relative_path_str, inside_root):
             return False
 
         # Check against indexing-specific default ignores
-        default_ignores = self.get_indexing_default_ignores()
-        for ignore in default_ignores:
-            if self._matches_pattern(relative_path_str, filename, ignore):
-                return False
+        if self._index_default_patterns.matches(relative_path_str, filename, path_parts):
+            return False
 
         # Check against custom excludes
-        for exclude in indexing_config['exclude']:
-            if self._matches_pattern(relative_path_str, filename, exclude):
-                return False
+        if self._index_exclude_patterns.matches(relative_path_str, filename, path_parts):
+            return False
 
         # Check includes (if specified, only include matching files)
-        includes = indexing_config['include']
-        if includes:
-            return any(self._matches_pattern(relative_path_str, filename, inc) for inc in includes)
+        if self._index_include_patterns:
+            return self._index_include_patterns.matches(relative_path_str, filename, path_parts)
 
         return True
-
-    def _matches_pattern(self, path: str, filename: str, pattern: str) -> bool:
-        """Check if path or filename matches a glob-like pattern"""
-        # Direct match
-        if fnmatch.fnmatch(path, pattern):
-            return True
-        if fnmatch.fnmatch(filename, pattern):
-            return True
-
-        # Check if pattern matches any path component
-        if '/' not in pattern and '*' not in pattern:
-            path_parts = path.split('/')
-            if pattern in path_parts:
-                return True
-
-        return False
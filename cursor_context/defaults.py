@@ -7,5 +7,8 @@ DEFAULT_FORMAT = 'xml'
 DEFAULT_INDEXING_ENABLED = True
 DEFAULT_INDEXING_INCLUDE = []  # Empty = index everything
 DEFAULT_INDEXING_EXCLUDE = []  # Default excludes are handled in config.py
+DEFAULT_INDEXING_USE_DEFAULT_IGNORES = True
 DEFAULT_INDEXING_DETAIL_LEVEL = "full"
-DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC = 3_000_000
\ No newline at end of file
+DEFAULT_INDEXING_ESTIMATE_BYTES_PER_SEC = 3_000_000
+DEFAULT_INDEXING_MAX_FILE_BYTES = 512 * 1024  # Larger files are almost always bundled or generated
+DEFAULT_INDEXING_PARSE_TIMEOUT_MS = 100
\ No newline at end of file
@@ -7,24 +7,23 @@ def ensure_gitignore_entry(project_root):
     entries = [
         '.cursor/rules/file-structure.mdc',
         '.cursor/rules/codebase-index.mdc',
+        '.cursor/.twiggy-cache.json',
+        '.cursor/.twiggy-cache.sqlite*',
     ]
 
     if gitignore_path.exists():
-        for entry in entries:
-            if not _entry_exists(gitignore_path, entry):
-                _append_entry(gitignore_path, entry)
+        # Read once and append every missing entry in a single write
+        existing = gitignore_path.read_text(encoding='utf-8')
+        missing = [entry for entry in entries if entry not in existing]
+        if missing:
+            _append_entries(gitignore_path, missing)
     else:
         _create_gitignore_with_entries(gitignore_path, entries)
 
 
-def _entry_exists(gitignore_path, entry):
-    with open(gitignore_path, 'r', encoding='utf-8') as f:
-        return entry in f.read()
-
-
-def _append_entry(gitignore_path, entry):
+def _append_entries(gitignore_path, entries):
     with open(gitignore_path, 'a', encoding='utf-8') as f:
-        f.write(f'\n# Twiggy\n{entry}\n')
+        f.write('\n# Twiggy\n' + ''.join(f'{entry}\n' for entry in entries))
 
 
 def _create_gitignore_with_entries(gitignore_path, entries):
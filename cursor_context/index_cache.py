@@ -0,0 +1,227 @@
+"""
+Index Cache - Persists extracted exports in SQLite, content-addressed.
+Exports are stored once per (content hash, grammar), so unchanged, reverted or duplicated files skip tree-sitter.
+Each file row also records the file's mtime and size, so files untouched since then aren't even read.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import xxhash
+
+# Bump when the stored rows or the extractor's output change; older databases are rebuilt
+SCHEMA_VERSION = 3
+
+# Recorded in the database, so switching hash functions rebuilds it rather than missing on every file
+HASH_ALGORITHM = "xxh3_64"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS files ("
+    "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+    "hash BLOB NOT NULL, language TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    "hash BLOB NOT NULL, language TEXT NOT NULL, exports TEXT NOT NULL, "
+    "PRIMARY KEY (hash, language))",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+
+def hash_content(data) -> bytes:
+    """Content hash used as the cache key; not cryptographic, only needs to tell files apart"""
+    return xxhash.xxh3_64_digest(data)
+
+
+class IndexCache:
+    """SQLite-backed maps of relative path -> (mtime, size, content hash) and content hash -> exports"""
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        # The watcher touches the cache from the observer thread
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use (skipped before init or if it can't be opened)"""
+        if self._conn is not None or self._disabled:
+            return self._conn
+
+        if not self.db_file.parent.is_dir():
+            return None
+
+        try:
+            conn = self._open()
+        except sqlite3.OperationalError:
+            # Locked, read-only or similar; run uncached rather than touch the file
+            self._disabled = True
+            return None
+        except sqlite3.DatabaseError:
+            # Corrupt or not a database at all; it is only a cache, so rebuild it
+            self._remove_files()
+            try:
+                conn = self._open()
+            except sqlite3.Error:
+                self._disabled = True
+                return None
+
+        self._conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION or self._stored_hash_algorithm(conn) != HASH_ALGORITHM:
+                # Written by another version; its rows can't be trusted, so start over
+                tables = [
+                    name
+                    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+                ]
+                for table in tables:
+                    conn.execute(f'DROP TABLE "{table}"')
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('hash_algorithm', ?)",
+                (HASH_ALGORITHM,),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _stored_hash_algorithm(self, conn: sqlite3.Connection) -> Optional[str]:
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'hash_algorithm'").fetchone()
+        except sqlite3.OperationalError:
+            # No meta table yet
+            return None
+        return row[0] if row else None
+
+    def _remove_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{self.db_file}{suffix}")
+            except OSError:
+                pass
+
+    def get(self, content_hash: bytes, language: str) -> Optional[List[list]]:
+        """Return the cached export rows for content with this hash, parsed as this language"""
+        row = self._fetch_one(
+            "SELECT exports FROM blobs WHERE hash = ? AND language = ?", (content_hash, language)
+        )
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def get_unchanged(
+        self, path: str, mtime_ns: int, size: int
+    ) -> Optional[Tuple[bytes, List[list]]]:
+        """Return (content hash, export rows) if path still has the mtime and size it was stored with"""
+        row = self._fetch_one(
+            "SELECT files.hash, blobs.exports FROM files JOIN blobs "
+            "ON blobs.hash = files.hash AND blobs.language = files.language "
+            "WHERE files.path = ? AND files.mtime_ns = ? AND files.size = ?",
+            (path, mtime_ns, size),
+        )
+        if row is None:
+            return None
+        try:
+            return row[0], json.loads(row[1])
+        except ValueError:
+            return None
+
+    def _fetch_one(self, query: str, params: tuple):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                return conn.execute(query, params).fetchone()
+            except sqlite3.Error:
+                return None
+
+    def put(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        content_hash: bytes,
+        language: str,
+        exports: List[list],
+    ):
+        """Record path's current content and that content's export rows; written on the next commit()"""
+        payload = json.dumps(exports, separators=(",", ":"))
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, hash, language) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, content_hash, language),
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, language, exports) VALUES (?, ?, ?)",
+                    (content_hash, language, payload),
+                )
+            except sqlite3.Error:
+                pass
+
+    def retain(self, paths: Iterable[str]):
+        """Drop rows for files that are no longer indexable, then exports no file refers to
+
+        Superseded contents stay cached until the next full index, so reverting
+        a file while watching is still a cache hit.
+        """
+        keep = set(paths)
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                stale = [
+                    (path,)
+                    for (path,) in conn.execute("SELECT path FROM files")
+                    if path not in keep
+                ]
+                if stale:
+                    conn.executemany("DELETE FROM files WHERE path = ?", stale)
+                conn.execute(
+                    "DELETE FROM blobs WHERE NOT EXISTS (SELECT 1 FROM files "
+                    "WHERE files.hash = blobs.hash AND files.language = blobs.language)"
+                )
+            except sqlite3.Error:
+                pass
+
+    def commit(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
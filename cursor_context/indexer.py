@@ -3,18 +3,203 @@ Codebase Indexer - Extracts function signatures, types, classes, and exports fro
 Uses tree-sitter for AST-based parsing.
 """
 
+import mmap
+import multiprocessing
+import os
 import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
-from importlib import resources
+from functools import lru_cache
+from importlib import import_module, resources
 
 import tree_sitter
-import tree_sitter_typescript as ts_typescript
-import tree_sitter_javascript as ts_javascript
 
+from .index_cache import IndexCache, hash_content
+from .rule_file import split_template, write_rule_file
+
+
+INDEXABLE_EXTENSIONS = frozenset({".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"})
+
+# One match per file name instead of splitext + set lookup; like splitext, leading
+# dots don't start an extension, so a file named ".ts" is not indexable
+_INDEXABLE_NAME_RE = re.compile(
+    r"\.*[^.].*\.(?:%s)\Z" % "|".join(sorted(ext[1:] for ext in INDEXABLE_EXTENSIONS)),
+    re.IGNORECASE,
+)
+
+# Chunk size for feeding source to the parser when a parse deadline is set
+PARSE_READ_CHUNK = 16 * 1024
+
+# Files at least this large are memory-mapped; below it a plain read is cheaper
+MMAP_MIN_BYTES = 512 * 1024
+
+# Full indexes below this many files stay in-process; pool startup would dominate
+PARALLEL_INDEX_MIN_FILES = 64
+PARALLEL_INDEX_CHUNKSIZE = 16
+
+# Files whose last source and tree are kept, so the next save reparses only what changed
+INCREMENTAL_PARSE_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=None)
+def _compile_glob(pattern: str) -> "re.Pattern":
+    """Compile a Path.glob()-style pattern relative to the project root"""
+    components = pattern.strip("/").split("/")
+    parts = []
+    for index, component in enumerate(components):
+        is_last = index == len(components) - 1
+        if component == "**":
+            parts.append("(?:[^/]+/)*[^/]+" if is_last else "(?:[^/]+/)*")
+            continue
+        regex, i = "", 0
+        while i < len(component):
+            char = component[i]
+            end = component.find("]", i + 2) if char == "[" else -1
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif end != -1:
+                body = component[i + 1 : end]
+                regex += "[^" + body[1:] + "]" if body.startswith("!") else "[" + body + "]"
+                i = end
+            else:
+                regex += re.escape(char)
+            i += 1
+        parts.append(regex if is_last else regex + "/")
+    return re.compile("".join(parts) + r"\Z")
+
+
+def _relative_posix_path(path_str: str, root_prefix: str) -> str:
+    """Slice root_prefix (root plus trailing separator) off a path below it, in posix form"""
+    relative_path = path_str[len(root_prefix) :]
+    return relative_path.replace(os.sep, "/") if os.sep != "/" else relative_path
+
+
+def _compile_globs(patterns: List[str]) -> Optional["re.Pattern"]:
+    """Compile Path.glob()-style patterns into one alternation regex (None if empty)"""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{_compile_glob(pattern).pattern})" for pattern in patterns))
+
+
+# Declarations handled by the extractor methods; kinds a grammar lacks (plain JS) are skipped
+_EXPORT_DECLARATION_KINDS = (
+    "class_declaration",
+    "type_alias_declaration",
+    "interface_declaration",
+    "lexical_declaration",
+    "enum_declaration",
+)
+
+
+def _build_export_query(language: tree_sitter.Language):
+    """Compile the query that finds export statements and the parts of exported functions"""
+
+    def has_kind(kind: str) -> bool:
+        return bool(language.id_for_node_kind(kind, True))
+
+    return_type = " (type_annotation)? @return" if has_kind("type_annotation") else ""
+    patterns = ['(export_statement "default" @default) @export']
+    for kind, capture in (
+        ("function_declaration", "function"),
+        ("function_signature", "signature"),
+    ):
+        if has_kind(kind):
+            patterns.append(
+                f"(export_statement ({kind} (identifier) @name"
+                f" (formal_parameters)? @params{return_type}) @{capture}) @export"
+            )
+    kinds = " ".join(f"({kind})" for kind in _EXPORT_DECLARATION_KINDS if has_kind(kind))
+    patterns.append(f"(export_statement [{kinds}] @declaration) @export")
+    query_source = "\n".join(patterns)
+
+    if hasattr(tree_sitter, "QueryCursor"):
+        return tree_sitter.Query(language, query_source)
+
+    # py-tree-sitter < 0.25 keeps cursor state on the query itself
+    query = language.query(query_source)
+    query.set_max_start_depth(1)
+    return query
+
+
+@lru_cache(maxsize=None)
+def _load_language(module_name: str, factory_name: str) -> tree_sitter.Language:
+    """Import a grammar module and wrap its language, once per process"""
+    factory = getattr(import_module(module_name), factory_name)
+    return tree_sitter.Language(factory())
+
+
+@lru_cache(maxsize=None)
+def _export_query(module_name: str, factory_name: str):
+    """The export query for a grammar, compiled once per process (None if unavailable)
+
+    Keyed by grammar rather than language name, so javascript and jsx share one.
+    """
+    try:
+        return _build_export_query(_load_language(module_name, factory_name))
+    except Exception:
+        # Older bindings without the query APIs fall back to Python-side walks
+        return None
+
+
+class _NodeKinds(NamedTuple):
+    """Kind ids of the nodes the extractor dispatches on, for one grammar (-1 if absent)"""
+
+    default: int
+    lexical_declaration: int
+    function_declaration: int
+    class_declaration: int
+    type_alias_declaration: int
+    interface_declaration: int
+    enum_declaration: int
+    function_signature: int
+    method_definition: int
+    public_field_definition: int
+    property_signature: int
+    method_signature: int
+    enum_member: int
 
-@dataclass
+
+@lru_cache(maxsize=None)
+def _node_kinds(language: tree_sitter.Language) -> _NodeKinds:
+    """Look the kind names up once per grammar, so the walk compares ints, not type strings"""
+    ids = []
+    for kind in _NodeKinds._fields:
+        # "default" is the keyword token; everything else is a named node
+        kind_id = language.id_for_node_kind(kind, kind != "default")
+        ids.append(kind_id if kind_id else -1)
+    return _NodeKinds(*ids)
+
+
+def _root_query_matches(query, root):
+    """Run a query for matches starting at the root's direct children only
+
+    The root may be an ERROR node on unparseable files, so patterns can't
+    anchor on (program); a start depth of 1 keeps nested exports out instead.
+    """
+    if hasattr(tree_sitter, "QueryCursor"):
+        cursor = tree_sitter.QueryCursor(query)
+        cursor.set_max_start_depth(1)
+        return cursor.matches(root)
+    return query.matches(root)
+
+
+# Export records are created per declaration across the whole codebase; drop their
+# per-instance __dict__ where dataclasses support it (Python 3.10+)
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ExportedItem:
     """Represents an exported item from a source file"""
 
@@ -24,7 +209,7 @@ class ExportedItem:
     methods: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class FileIndex:
     """Represents the indexed contents of a single file"""
 
@@ -33,32 +218,55 @@ class FileIndex:
 
 
 class TreeSitterParser:
-    """Handles tree-sitter parsing for different languages"""
+    """Handles tree-sitter parsing for different languages
+
+    Languages are shared; tree_sitter.Parser objects are not thread-safe, so
+    each thread lazily builds and then reuses its own parser per language.
+    """
 
     def __init__(self):
-        self._parsers: Dict[str, tree_sitter.Parser] = {}
-        self._languages: Dict[str, tree_sitter.Language] = {}
+        self._local = threading.local()
         self._init_languages()
 
     def _init_languages(self):
-        """Initialize supported languages"""
-        self._languages["typescript"] = tree_sitter.Language(
-            ts_typescript.language_typescript()
-        )
-        self._languages["tsx"] = tree_sitter.Language(ts_typescript.language_tsx())
-        self._languages["javascript"] = tree_sitter.Language(ts_javascript.language())
-        self._languages["jsx"] = self._languages["javascript"]
+        """Register supported languages; grammar modules are imported on first use"""
+        # (module, function returning the language pointer)
+        self._language_factories = {
+            "typescript": ("tree_sitter_typescript", "language_typescript"),
+            "tsx": ("tree_sitter_typescript", "language_tsx"),
+            "javascript": ("tree_sitter_javascript", "language"),
+            "jsx": ("tree_sitter_javascript", "language"),
+        }
+
+    def _get_language(self, language: str) -> Optional[tree_sitter.Language]:
+        """Get the language, loading its grammar on first request"""
+        grammar = self._language_factories.get(language)
+        if grammar is None:
+            return None
+        return _load_language(*grammar)
 
     def get_parser(self, language: str) -> Optional[tree_sitter.Parser]:
         """Get or create a parser for the given language"""
-        if language not in self._languages:
+        ts_language = self._get_language(language)
+        if ts_language is None:
             return None
 
-        if language not in self._parsers:
-            parser = tree_sitter.Parser(self._languages[language])
-            self._parsers[language] = parser
+        parsers = getattr(self._local, "parsers", None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
 
-        return self._parsers[language]
+        parser = parsers.get(language)
+        if parser is None:
+            parser = parsers[language] = tree_sitter.Parser(ts_language)
+
+        return parser
+
+    def get_export_query(self, language: str):
+        """Get the compiled export query for the given language (None if unavailable)"""
+        grammar = self._language_factories.get(language)
+        if grammar is None:
+            return None
+        return _export_query(*grammar)
 
     def get_language_for_file(self, file_path: Path) -> Optional[str]:
         """Determine language from file extension"""
@@ -77,81 +285,191 @@ class TypeScriptExtractor:
     """Extracts exports from TypeScript/JavaScript AST"""
 
     def extract_exports(
-        self, tree: tree_sitter.Tree, source: bytes
+        self, tree: tree_sitter.Tree, source: bytes, query=None
     ) -> List[ExportedItem]:
-        """Extract all exported items from the AST"""
-        exports = []
+        """Extract all exported items from the AST, using the export query when given"""
         root = tree.root_node
+        kinds = _node_kinds(tree.language)
+        # Slicing a memoryview doesn't copy; _get_text decodes straight from the buffer.
+        # Release it on the way out so a memory-mapped source can be closed.
+        with memoryview(source) as view:
+            text = self._decode_ascii(view)
+            source = view if text is None else text
 
-        for child in root.children:
-            if child.type == "export_statement":
-                exports.extend(self._process_export_statement(child, source))
+            if query is not None:
+                return self._extract_with_query(query, root, source, kinds)
 
-        return exports
+            exports = []
+            for child in root.children:
+                if child.type == "export_statement":
+                    exports.extend(self._process_export_statement(child, source, kinds))
+
+            return exports
+
+    def _decode_ascii(self, source) -> Optional[str]:
+        """Decode ASCII source once so byte offsets index the text directly (None otherwise)"""
+        try:
+            return str(source, "ascii")
+        except UnicodeDecodeError:
+            return None
+
+    def _extract_with_query(
+        self, query, root, source: bytes, kinds: _NodeKinds
+    ) -> List[ExportedItem]:
+        """Build exports from query captures; the query engine does the tree walk in C"""
+        matches = _root_query_matches(query, root)
+        default_exports = {
+            captures["export"][0].start_byte
+            for _, captures in matches
+            if "default" in captures
+        }
 
-    def _process_export_statement(self, node, source: bytes) -> List[ExportedItem]:
+        # Keyed by declaration start so the result keeps source order
+        found: Dict[int, Sequence[ExportedItem]] = {}
+        for _, captures in matches:
+            if "default" in captures:
+                continue
+
+            is_default = captures["export"][0].start_byte in default_exports
+            function_nodes = captures.get("function") or captures.get("signature")
+            if function_nodes:
+                node = function_nodes[0]
+                if node.start_byte not in found:
+                    found[node.start_byte] = (
+                        self._function_from_captures(captures, source, is_default),
+                    )
+                continue
+
+            node = captures["declaration"][0]
+            if node.start_byte not in found:
+                found[node.start_byte] = self._extract_declaration(
+                    node, source, kinds, is_default
+                )
+
+        return [item for start in sorted(found) for item in found[start]]
+
+    def _function_from_captures(
+        self, captures, source: bytes, is_default: bool
+    ) -> ExportedItem:
+        """Exported function or function signature from its captured parts"""
+        name = self._get_text(captures["name"][0], source)
+        params_nodes = captures.get("params")
+        return_type_nodes = captures.get("return")
+
+        params = self._get_text(params_nodes[0], source) if params_nodes else "()"
+        return_type = (
+            self._get_text(return_type_nodes[0], source) if return_type_nodes else ""
+        )
+
+        if "signature" in captures:
+            prefix = "export "
+        else:
+            prefix = "export default " if is_default else "export "
+        signature = f"{prefix}function {name}{params}{return_type}"
+
+        return ExportedItem(kind="function", name=name, signature=signature)
+
+    def _process_export_statement(
+        self, node, source: bytes, kinds: _NodeKinds
+    ) -> List[ExportedItem]:
         """Process an export statement node"""
         exports = []
 
-        # Check for default export
-        is_default = any(c.type == "default" for c in node.children)
-
-        for child in node.children:
-            if child.type == "function_declaration":
-                item = self._extract_function(child, source, is_default)
-                if item:
-                    exports.append(item)
-            elif child.type == "class_declaration":
-                item = self._extract_class(child, source, is_default)
-                if item:
-                    exports.append(item)
-            elif child.type == "type_alias_declaration":
-                item = self._extract_type_alias(child, source)
-                if item:
-                    exports.append(item)
-            elif child.type == "interface_declaration":
-                item = self._extract_interface(child, source)
-                if item:
-                    exports.append(item)
-            elif child.type == "lexical_declaration":
-                exports.extend(self._extract_lexical_declaration(child, source))
-            elif child.type == "enum_declaration":
-                item = self._extract_enum(child, source)
-                if item:
-                    exports.append(item)
-            elif child.type == "function_signature":
-                item = self._extract_function_signature(child, source)
-                if item:
-                    exports.append(item)
+        # One cursor pass; "default" precedes the declaration but is checked over all children
+        is_default = False
+        declarations = []
+        for child in self._iter_children(node):
+            if child.kind_id == kinds.default:
+                is_default = True
+            else:
+                declarations.append(child)
+
+        for child in declarations:
+            exports.extend(self._extract_declaration(child, source, kinds, is_default))
 
         return exports
 
+    def _extract_declaration(
+        self, node, source: bytes, kinds: _NodeKinds, is_default: bool = False
+    ) -> Sequence[ExportedItem]:
+        """Extract the items declared by one child of an export statement
+
+        Single items come back as 1-tuples and misses as the shared empty tuple,
+        so the many non-declaration children don't each allocate a list.
+        """
+        kind = node.kind_id
+        if kind == kinds.lexical_declaration:
+            return self._extract_lexical_declaration(node, source)
+
+        if kind == kinds.function_declaration:
+            item = self._extract_function(node, source, is_default)
+        elif kind == kinds.class_declaration:
+            item = self._extract_class(node, source, kinds, is_default)
+        elif kind == kinds.type_alias_declaration:
+            item = self._extract_type_alias(node, source)
+        elif kind == kinds.interface_declaration:
+            item = self._extract_interface(node, source, kinds)
+        elif kind == kinds.enum_declaration:
+            item = self._extract_enum(node, source, kinds)
+        elif kind == kinds.function_signature:
+            item = self._extract_function_signature(node, source)
+        else:
+            return ()
+
+        return (item,) if item else ()
+
     def _get_text(self, node, source: bytes) -> str:
-        """Get text content of a node"""
-        return source[node.start_byte : node.end_byte].decode("utf-8")
+        """Get text content of a node (source is pre-decoded text when the file is ASCII)"""
+        chunk = source[node.start_byte : node.end_byte]
+        return chunk if chunk.__class__ is str else str(chunk, "utf-8")
+
+    def _children_by_type(self, children) -> Dict[str, list]:
+        """Group child nodes by type in a single pass over the (costly) children list"""
+        by_type: Dict[str, list] = {}
+        for child in children:
+            nodes = by_type.get(child.type)
+            if nodes is None:
+                by_type[child.type] = [child]
+            else:
+                nodes.append(child)
+        return by_type
+
+    def _first(self, by_type: Dict[str, list], *type_names: str):
+        """First child of the first listed type that is present"""
+        for type_name in type_names:
+            nodes = by_type.get(type_name)
+            if nodes:
+                return nodes[0]
+        return None
+
+    def _iter_children(self, node):
+        """Yield child nodes via a tree cursor, without building the children list"""
+        cursor = node.walk()
+        if not cursor.goto_first_child():
+            return
+        yield cursor.node
+        while cursor.goto_next_sibling():
+            yield cursor.node
 
     def _find_child(self, node, type_name: str):
         """Find first child of given type"""
-        for child in node.children:
+        for child in self._iter_children(node):
             if child.type == type_name:
                 return child
         return None
 
-    def _find_children(self, node, type_name: str):
-        """Find all children of given type"""
-        return [c for c in node.children if c.type == type_name]
-
     def _extract_function(
         self, node, source: bytes, is_default: bool = False
     ) -> Optional[ExportedItem]:
         """Extract function declaration"""
-        name_node = self._find_child(node, "identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
-        params_node = self._find_child(node, "formal_parameters")
-        return_type_node = self._find_child(node, "type_annotation")
+        params_node = self._first(children, "formal_parameters")
+        return_type_node = self._first(children, "type_annotation")
 
         params = self._get_text(params_node, source) if params_node else "()"
         return_type = (
@@ -167,13 +485,14 @@ class TypeScriptExtractor:
         self, node, source: bytes
     ) -> Optional[ExportedItem]:
         """Extract function signature (for .d.ts files or ambient declarations)"""
-        name_node = self._find_child(node, "identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
-        params_node = self._find_child(node, "formal_parameters")
-        return_type_node = self._find_child(node, "type_annotation")
+        params_node = self._first(children, "formal_parameters")
+        return_type_node = self._first(children, "type_annotation")
 
         params = self._get_text(params_node, source) if params_node else "()"
         return_type = (
@@ -185,12 +504,11 @@ class TypeScriptExtractor:
         return ExportedItem(kind="function", name=name, signature=signature)
 
     def _extract_class(
-        self, node, source: bytes, is_default: bool = False
+        self, node, source: bytes, kinds: _NodeKinds, is_default: bool = False
     ) -> Optional[ExportedItem]:
         """Extract class declaration with public methods"""
-        name_node = self._find_child(node, "identifier") or self._find_child(
-            node, "type_identifier"
-        )
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "identifier", "type_identifier")
         if not name_node:
             return None
 
@@ -198,20 +516,21 @@ class TypeScriptExtractor:
 
         # Get heritage (extends/implements)
         heritage = ""
-        heritage_node = self._find_child(node, "class_heritage")
+        heritage_node = self._first(children, "class_heritage")
         if heritage_node:
             heritage = " " + self._get_text(heritage_node, source)
 
         # Extract public methods
         methods = []
-        class_body = self._find_child(node, "class_body")
+        class_body = self._first(children, "class_body")
         if class_body:
-            for member in class_body.children:
-                if member.type == "method_definition":
+            for member in self._iter_children(class_body):
+                member_kind = member.kind_id
+                if member_kind == kinds.method_definition:
                     method_sig = self._extract_method_signature(member, source)
                     if method_sig:
                         methods.append(method_sig)
-                elif member.type == "public_field_definition":
+                elif member_kind == kinds.public_field_definition:
                     field_sig = self._extract_field_signature(member, source)
                     if field_sig:
                         methods.append(field_sig)
@@ -225,64 +544,70 @@ class TypeScriptExtractor:
 
     def _extract_method_signature(self, node, source: bytes) -> Optional[str]:
         """Extract method signature from class"""
+        node_children = node.children
+        children = self._children_by_type(node_children)
+
         # Skip private methods
-        for child in node.children:
-            if child.type == "private" or child.type == "accessibility_modifier":
-                text = self._get_text(child, source)
-                if text == "private":
+        for modifier_type in ("private", "accessibility_modifier"):
+            for child in children.get(modifier_type, ()):
+                if self._get_text(child, source) == "private":
                     return None
 
-        name_node = self._find_child(node, "property_identifier")
+        name_node = self._first(children, "property_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
-        params_node = self._find_child(node, "formal_parameters")
-        return_type_node = self._find_child(node, "type_annotation")
+        params_node = self._first(children, "formal_parameters")
+        return_type_node = self._first(children, "type_annotation")
 
         params = self._get_text(params_node, source) if params_node else "()"
         return_type = (
             self._get_text(return_type_node, source) if return_type_node else ""
         )
 
-        # Check for async/static
+        # Check for async/static (in source order)
         modifiers = []
-        for child in node.children:
-            if child.type == "async":
-                modifiers.append("async")
-            elif child.type == "static":
-                modifiers.append("static")
+        if "async" in children or "static" in children:
+            for child in node_children:
+                if child.type == "async":
+                    modifiers.append("async")
+                elif child.type == "static":
+                    modifiers.append("static")
 
         prefix = " ".join(modifiers) + " " if modifiers else ""
         return f"{prefix}{name}{params}{return_type}"
 
     def _extract_field_signature(self, node, source: bytes) -> Optional[str]:
         """Extract public field signature from class"""
-        name_node = self._find_child(node, "property_identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "property_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
-        type_node = self._find_child(node, "type_annotation")
+        type_node = self._first(children, "type_annotation")
         type_str = self._get_text(type_node, source) if type_node else ""
 
         return f"{name}{type_str}"
 
     def _extract_type_alias(self, node, source: bytes) -> Optional[ExportedItem]:
         """Extract type alias declaration"""
-        name_node = self._find_child(node, "type_identifier")
+        node_children = node.children
+        children = self._children_by_type(node_children)
+        name_node = self._first(children, "type_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
 
         # Get the full type definition (simplified)
-        type_params = self._find_child(node, "type_parameters")
+        type_params = self._first(children, "type_parameters")
         type_params_str = self._get_text(type_params, source) if type_params else ""
 
         # Get the type value
         type_node = None
-        for child in node.children:
+        for child in node_children:
             if child.type not in [
                 "export",
                 "type",
@@ -303,36 +628,38 @@ class TypeScriptExtractor:
 
         return ExportedItem(kind="type", name=name, signature=signature)
 
-    def _extract_interface(self, node, source: bytes) -> Optional[ExportedItem]:
+    def _extract_interface(
+        self, node, source: bytes, kinds: _NodeKinds
+    ) -> Optional[ExportedItem]:
         """Extract interface declaration"""
-        name_node = self._find_child(node, "type_identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "type_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
 
         # Get type parameters
-        type_params = self._find_child(node, "type_parameters")
+        type_params = self._first(children, "type_parameters")
         type_params_str = self._get_text(type_params, source) if type_params else ""
 
         # Get extends clause
         extends = ""
-        extends_node = self._find_child(node, "extends_type_clause")
+        extends_node = self._first(children, "extends_type_clause")
         if extends_node:
             extends = " " + self._get_text(extends_node, source)
 
         # Get interface body (properties)
         properties = []
-        body = self._find_child(node, "interface_body") or self._find_child(
-            node, "object_type"
-        )
+        body = self._first(children, "interface_body", "object_type")
         if body:
-            for member in body.children:
-                if member.type == "property_signature":
+            for member in self._iter_children(body):
+                member_kind = member.kind_id
+                if member_kind == kinds.property_signature:
                     prop_sig = self._extract_property_signature(member, source)
                     if prop_sig:
                         properties.append(prop_sig)
-                elif member.type == "method_signature":
+                elif member_kind == kinds.method_signature:
                     method_sig = self._extract_interface_method_signature(
                         member, source
                     )
@@ -347,29 +674,31 @@ class TypeScriptExtractor:
 
     def _extract_property_signature(self, node, source: bytes) -> Optional[str]:
         """Extract property signature from interface"""
-        name_node = self._find_child(node, "property_identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "property_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
 
         # Check for optional
-        optional = "?" if self._find_child(node, "?") else ""
+        optional = "?" if "?" in children else ""
 
-        type_node = self._find_child(node, "type_annotation")
+        type_node = self._first(children, "type_annotation")
         type_str = self._get_text(type_node, source) if type_node else ""
 
         return f"{name}{optional}{type_str}"
 
     def _extract_interface_method_signature(self, node, source: bytes) -> Optional[str]:
         """Extract method signature from interface"""
-        name_node = self._find_child(node, "property_identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "property_identifier")
         if not name_node:
             return None
 
         name = self._get_text(name_node, source)
-        params_node = self._find_child(node, "formal_parameters")
-        return_type_node = self._find_child(node, "type_annotation")
+        params_node = self._first(children, "formal_parameters")
+        return_type_node = self._first(children, "type_annotation")
 
         params = self._get_text(params_node, source) if params_node else "()"
         return_type = (
@@ -382,19 +711,20 @@ class TypeScriptExtractor:
         """Extract const/let declarations"""
         exports = []
 
-        # Get const/let keyword
-        keyword = "const"
-        for child in node.children:
-            if child.type in ["const", "let", "var"]:
-                keyword = child.type
-                break
-
-        # Get variable declarators
-        for child in node.children:
-            if child.type == "variable_declarator":
-                item = self._extract_variable_declarator(child, source, keyword)
-                if item:
-                    exports.append(item)
+        # Get const/let keyword and variable declarators in one cursor pass
+        keyword = None
+        declarators = []
+        for child in self._iter_children(node):
+            child_type = child.type
+            if child_type == "variable_declarator":
+                declarators.append(child)
+            elif keyword is None and child_type in ("const", "let", "var"):
+                keyword = child_type
+
+        for child in declarators:
+            item = self._extract_variable_declarator(child, source, keyword or "const")
+            if item:
+                exports.append(item)
 
         return exports
 
@@ -402,29 +732,32 @@ class TypeScriptExtractor:
         self, node, source: bytes, keyword: str
     ) -> Optional[ExportedItem]:
         """Extract a single variable declaration"""
-        name_node = self._find_child(node, "identifier")
+        node_children = node.children
+        children = self._children_by_type(node_children)
+        name_node = self._first(children, "identifier")
         if not name_node:
             # Could be destructuring pattern
             return None
 
         name = self._get_text(name_node, source)
-        type_node = self._find_child(node, "type_annotation")
+        type_node = self._first(children, "type_annotation")
         type_str = self._get_text(type_node, source) if type_node else ""
 
         # Check if it's a function (arrow function or function expression)
         value_node = None
-        for child in node.children:
+        for child in node_children:
             if child.type in ["arrow_function", "function_expression", "function"]:
                 value_node = child
                 break
 
         if value_node:
             # It's a function
+            value_children = self._children_by_type(value_node.children)
             if value_node.type == "arrow_function":
-                params_node = self._find_child(value_node, "formal_parameters")
+                params_node = self._first(value_children, "formal_parameters")
                 if not params_node:
                     # Single param without parens
-                    param_node = self._find_child(value_node, "identifier")
+                    param_node = self._first(value_children, "identifier")
                     params = (
                         f"({self._get_text(param_node, source)})"
                         if param_node
@@ -433,16 +766,16 @@ class TypeScriptExtractor:
                 else:
                     params = self._get_text(params_node, source)
 
-                return_type_node = self._find_child(value_node, "type_annotation")
+                return_type_node = self._first(value_children, "type_annotation")
                 return_type = (
                     self._get_text(return_type_node, source) if return_type_node else ""
                 )
 
                 signature = f"export {keyword} {name} = {params}{return_type} => ..."
             else:
-                params_node = self._find_child(value_node, "formal_parameters")
+                params_node = self._first(value_children, "formal_parameters")
                 params = self._get_text(params_node, source) if params_node else "()"
-                return_type_node = self._find_child(value_node, "type_annotation")
+                return_type_node = self._first(value_children, "type_annotation")
                 return_type = (
                     self._get_text(return_type_node, source) if return_type_node else ""
                 )
@@ -458,9 +791,12 @@ class TypeScriptExtractor:
             signature=signature,
         )
 
-    def _extract_enum(self, node, source: bytes) -> Optional[ExportedItem]:
+    def _extract_enum(
+        self, node, source: bytes, kinds: _NodeKinds
+    ) -> Optional[ExportedItem]:
         """Extract enum declaration"""
-        name_node = self._find_child(node, "identifier")
+        children = self._children_by_type(node.children)
+        name_node = self._first(children, "identifier")
         if not name_node:
             return None
 
@@ -468,10 +804,10 @@ class TypeScriptExtractor:
 
         # Get enum members
         members = []
-        body = self._find_child(node, "enum_body")
+        body = self._first(children, "enum_body")
         if body:
-            for child in body.children:
-                if child.type == "enum_member":
+            for child in self._iter_children(body):
+                if child.kind_id == kinds.enum_member:
                     member_name = self._find_child(child, "property_identifier")
                     if member_name:
                         members.append(self._get_text(member_name, source))
@@ -494,18 +830,7 @@ class SkeletonGenerator:
         )
 
     def generate(self, file_indices: List[FileIndex]) -> Path:
-        """Generate the skeleton output file"""
-        self.output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        content = self._build_content(file_indices)
-
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            f.write(content)
-
-        return self.output_file
-
-    def _build_content(self, file_indices: List[FileIndex]) -> str:
-        """Build the full content for the output file"""
+        """Generate the skeleton output file, streaming the index lines to disk"""
         project_name = self.project_root.name
         self.detail_level = self.config.get_indexing_config().get("detailLevel", "full")
 
@@ -518,20 +843,21 @@ class SkeletonGenerator:
         except (FileNotFoundError, TypeError):
             template = self._get_fallback_template()
 
-        index_content = self._format_indices(file_indices)
+        head, tail = split_template(template, "index_content", project_name=project_name)
+        # The index content always ends in a newline ahead of the template's own text
+        lines = _rstrip_lines(self._format_indices(file_indices))
+        write_rule_file(self.output_file, head, lines, "\n" + tail)
 
-        return template.format(project_name=project_name, index_content=index_content)
-
-    def _format_indices(self, file_indices: List[FileIndex]) -> str:
-        """Format all file indices into hierarchical grouped format"""
-        lines = []
+        return self.output_file
 
+    def _format_indices(self, file_indices: List[FileIndex]) -> Iterator[str]:
+        """Yield all file indices as lines in hierarchical grouped format"""
         # Group files by directory
         dir_groups = self._group_by_directory(file_indices)
 
         for dir_path, files in sorted(dir_groups.items()):
             # Directory header
-            lines.append(f"## {dir_path}\n")
+            yield f"## {dir_path}\n"
 
             for file_index in sorted(files, key=lambda x: x.path):
                 if not file_index.exports:
@@ -539,21 +865,19 @@ class SkeletonGenerator:
 
                 # Get just the filename (or relative path within directory)
                 filename = file_index.path[len(dir_path) :].lstrip("/")
-                lines.append(f"{filename}")
+                yield filename
 
                 # Indent exports
                 for export in file_index.exports:
                     formatted = self._format_export(export)
                     # Indent each line of the export
                     indented = "\n".join(f"  {line}" for line in formatted.split("\n"))
-                    lines.append(indented)
+                    yield indented
 
-                lines.append("")  # Blank line between files
+                yield ""  # Blank line between files
 
             # Extra blank line between directories (but not after the last one)
 
-        return "\n".join(lines).rstrip() + "\n"
-
     def _group_by_directory(
         self, file_indices: List[FileIndex]
     ) -> Dict[str, List[FileIndex]]:
@@ -680,23 +1004,283 @@ class SkeletonGenerator:
         )
 
 
+def _rstrip_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines so that joining them equals "\n".join(lines).rstrip(), without the join"""
+    last = None
+    blanks = []
+    for line in lines:
+        if not line.strip():
+            blanks.append(line)
+            continue
+        if last is not None:
+            yield last
+        yield from blanks
+        blanks.clear()
+        last = line
+
+    if last is not None:
+        yield last.rstrip()
+
+
+def _encode_exports(exports: List[ExportedItem]) -> List[list]:
+    return [[e.kind, e.name, e.signature, e.methods] for e in exports]
+
+
+def _decode_exports(rows: List[list]) -> List[ExportedItem]:
+    return [ExportedItem(*row) for row in rows]
+
+
+# Per-process parser state for pool workers, created on the first file each worker sees
+_worker_parser: Optional[TreeSitterParser] = None
+_worker_extractor: Optional[TypeScriptExtractor] = None
+
+
+def _process_pool_context():
+    """The default start method, or forkserver/spawn once other threads are running
+
+    Forking copies locks that other threads (the watcher's observer, timers and
+    workers) may hold at that moment, which can deadlock the children.
+    """
+    if threading.active_count() == 1:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _index_file_worker(file_path: str, project_root: str, timeout_micros: int = 0):
+    """Read, hash and index one file in a worker process
+
+    Returns (file_path, stat_key, content_hash, FileIndex or None); stat_key is
+    None when the file could not be read.
+    """
+    global _worker_parser, _worker_extractor
+    if _worker_parser is None:
+        _worker_parser = TreeSitterParser()
+        _worker_extractor = TypeScriptExtractor()
+
+    path = Path(file_path)
+    relative_path = _relative_posix_path(file_path, os.path.join(project_root, ""))
+    try:
+        stat = os.stat(file_path)
+        with _read_source(file_path, stat.st_size) as source:
+            content_hash = hash_content(source)
+            index = _parse_file(
+                _worker_parser, _worker_extractor, path, relative_path, source, timeout_micros
+            )
+    except OSError:
+        return file_path, None, None, None
+
+    return file_path, _stat_key(stat), content_hash, index
+
+
+def _stat_key(stat: os.stat_result) -> Tuple[int, int]:
+    """(mtime in ns, size): a file whose key is unchanged is assumed unchanged"""
+    return stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def _read_source(file_path, size: int):
+    """Yield a file's contents, memory-mapping large files instead of copying them"""
+    with open(file_path, "rb") as f:
+        if size < MMAP_MIN_BYTES:
+            yield f.read()
+            return
+
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Emptied since it was stat'ed; mmap refuses zero-length files
+            yield f.read()
+            return
+
+        with mapped:
+            yield mapped
+
+
+def _parse_with_deadline(
+    ts_parser: tree_sitter.Parser,
+    source: bytes,
+    timeout_micros: int,
+    old_tree: Optional[tree_sitter.Tree] = None,
+) -> Optional[tree_sitter.Tree]:
+    """Parse source, giving up (None) once timeout_micros have elapsed (0 = no limit)
+
+    An edited old_tree lets tree-sitter reuse every subtree outside the edit.
+    """
+    # The bindings reject an explicit old_tree=None
+    options = {"old_tree": old_tree} if old_tree is not None else {}
+    if timeout_micros <= 0:
+        return ts_parser.parse(source, **options)
+
+    if not hasattr(tree_sitter, "QueryCursor"):
+        # py-tree-sitter < 0.25 has a parser-level timeout
+        ts_parser.timeout_micros = timeout_micros
+        tree = ts_parser.parse(source, **options)
+    else:
+        # Newer bindings dropped it, so check the deadline each time the lexer asks for input
+        deadline = time.perf_counter() + timeout_micros / 1_000_000
+        expired = False
+
+        def read(byte_offset, _point):
+            nonlocal expired
+            if time.perf_counter() > deadline:
+                expired = True
+                return b""
+            return source[byte_offset : byte_offset + PARSE_READ_CHUNK]
+
+        tree = ts_parser.parse(read, **options)
+        if expired:
+            tree = None
+
+    if tree is None:
+        # An abandoned parse would otherwise resume on the next call
+        ts_parser.reset()
+    return tree
+
+
+class _TreeCache:
+    """LRU of (source, tree) per relative path for incremental reparsing"""
+
+    def __init__(self, max_size: int = INCREMENTAL_PARSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[bytes, tree_sitter.Tree]]" = OrderedDict()
+
+    def edited_tree(self, relative_path: str, source: bytes) -> Optional[tree_sitter.Tree]:
+        """The path's previous tree, edited to line up with source (None if not cached)"""
+        entry = self._entries.pop(relative_path, None)
+        if entry is None:
+            return None
+
+        old_source, tree = entry
+        # One edit spanning everything between the common prefix and the common suffix
+        start = _common_prefix_length(old_source, source)
+        suffix = _common_suffix_length(old_source, source, start)
+        old_end = len(old_source) - suffix
+        new_end = len(source) - suffix
+        tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_byte_point(old_source, start),
+            old_end_point=_byte_point(old_source, old_end),
+            new_end_point=_byte_point(source, new_end),
+        )
+        return tree
+
+    def put(self, relative_path: str, source: bytes, tree: tree_sitter.Tree):
+        self._entries[relative_path] = (source, tree)
+        self._entries.move_to_end(relative_path)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, relative_path: str):
+        self._entries.pop(relative_path, None)
+
+    def discard_below(self, prefixes: Tuple[str, ...]):
+        for relative_path in [path for path in self._entries if path.startswith(prefixes)]:
+            del self._entries[relative_path]
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    """Length of the common prefix, by binary search over memcmp'd slices"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: bytes, b: bytes, prefix: int) -> int:
+    """Length of the common suffix that doesn't overlap the first prefix bytes"""
+    len_a, len_b = len(a), len(b)
+    low, high = 0, min(len_a, len_b) - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len_a - mid : len_a - low] == b[len_b - mid : len_b - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _byte_point(source: bytes, offset: int) -> Tuple[int, int]:
+    """(row, byte column) of an offset, as tree-sitter counts them"""
+    row = source.count(b"\n", 0, offset)
+    return row, offset - (source.rfind(b"\n", 0, offset) + 1)
+
+
+def _parse_file(
+    parser: TreeSitterParser,
+    extractor: TypeScriptExtractor,
+    file_path: Path,
+    relative_path: str,
+    source: bytes,
+    timeout_micros: int = 0,
+    trees: Optional[_TreeCache] = None,
+) -> Optional[FileIndex]:
+    """Parse source bytes and extract the file's exports (None if parsing fails or times out)
+
+    With trees, the file's previous tree is reused for an incremental parse and
+    the new one is kept for next time.
+    """
+    language = parser.get_language_for_file(file_path)
+    if not language:
+        return None
+
+    ts_parser = parser.get_parser(language)
+    if not ts_parser:
+        return None
+
+    # Every export statement contains the keyword; a memmem scan is far cheaper than a parse
+    if source.find(b"export") == -1:
+        return FileIndex(path=relative_path, exports=[])
+
+    # Memory-mapped sources would be copied to be kept; they are rare and big, so skip them
+    if trees is not None and source.__class__ is not bytes:
+        trees = None
+
+    try:
+        old_tree = trees.edited_tree(relative_path, source) if trees is not None else None
+        tree = _parse_with_deadline(ts_parser, source, timeout_micros, old_tree)
+        if tree is None:
+            return None
+        if trees is not None:
+            trees.put(relative_path, source, tree)
+
+        exports = extractor.extract_exports(
+            tree, source, parser.get_export_query(language)
+        )
+        return FileIndex(path=relative_path, exports=exports)
+
+    except Exception:
+        return None
+
+
 class CodebaseIndexer:
     """Main class that orchestrates the indexing process"""
 
     def __init__(self, config):
         self.config = config
         self.project_root = config.project_root
+        # Every indexed path is found below the root, so relative paths are string slices
+        self._root_prefix = os.path.join(str(self.project_root), "")
         self.parser = TreeSitterParser()
         self.generator = SkeletonGenerator(config)
         self._index_cache: Dict[str, FileIndex] = {}
-        self._mtime_cache: Dict[str, float] = {}
+        self._stat_cache: Dict[str, Tuple[int, int]] = {}
+        self._hash_manifest: Dict[str, bytes] = {}
+        self._store = IndexCache(config.index_cache_file)
+        # Trees of recently modified files, for incremental reparsing on their next save
+        self._trees = _TreeCache()
 
-        self.extractors = {
-            "typescript": TypeScriptExtractor(),
-            "tsx": TypeScriptExtractor(),
-            "javascript": TypeScriptExtractor(),
-            "jsx": TypeScriptExtractor(),
-        }
+        # Stateless, so one instance serves every language and thread
+        self.extractor = TypeScriptExtractor()
 
     def index_and_generate(
         self,
@@ -705,58 +1289,255 @@ class CodebaseIndexer:
         src_path: Optional[Path] = None,
     ) -> Path:
         """Index the codebase and generate output file"""
-        if not self._index_cache or not changed_path or not event_type:
+        changes = None
+        if changed_path and event_type:
+            changes = {changed_path: (event_type, src_path)}
+        return self.index_and_generate_batch(changes)
+
+    def index_and_generate_batch(
+        self, changes: Optional[Dict[Path, Tuple[str, Optional[Path]]]] = None
+    ) -> Path:
+        """Apply a batch of changes (path -> (event_type, src_path)), then generate the output once
+
+        Without changes, or before the first full index, everything is indexed.
+        A "deleted_directory" change drops every indexed file below that path.
+        If the changes leave every file's index as it was (a save that rewrote
+        identical bytes, a touch), the existing output is kept as is.
+        """
+        if not self._index_cache or not changes:
             file_indices = self._index_all_files()
         else:
-            self._update_for_change(event_type, changed_path, src_path)
+            previous = dict(self._index_cache)
+            self._remove_directories(
+                changed_path
+                for changed_path, (event_type, _) in changes.items()
+                if event_type == "deleted_directory"
+            )
+            for changed_path, (event_type, src_path) in changes.items():
+                self._update_for_change(event_type, changed_path, src_path)
+            if self._same_indices(previous) and self.generator.output_file.exists():
+                self._store.commit()
+                return self.generator.output_file
             file_indices = list(self._index_cache.values())
 
+        self._store.commit()
         return self.generator.generate(file_indices)
 
-    def get_indexable_files(self) -> List[Path]:
-        """Get all files that would be indexed"""
-        return self._find_indexable_files()
+    def _same_indices(self, previous: Dict[str, FileIndex]) -> bool:
+        """Whether the in-memory index holds exactly the FileIndex objects it held before"""
+        if len(previous) != len(self._index_cache):
+            return False
+        return all(previous.get(path) is index for path, index in self._index_cache.items())
+
+    def close(self):
+        """Flush and close the on-disk index cache"""
+        self._store.close()
+
+    def get_indexable_files(self) -> List[os.DirEntry]:
+        """Get directory entries for all files that would be indexed"""
+        indexing_config = self.config.get_indexing_config()
+        include_regex = _compile_globs(indexing_config.get("include", []))
+        max_file_bytes = indexing_config.get("maxFileBytes") or 0
+        is_indexable_name = _INDEXABLE_NAME_RE.match
+
+        entries = []
+        for entry in self._scandir_recursive(str(self.project_root)):
+            if not is_indexable_name(entry.name):
+                continue
+            if max_file_bytes > 0 and self._entry_size(entry) > max_file_bytes:
+                continue
+            file_path = Path(entry.path)
+            if include_regex and not include_regex.match(self._relative_path(file_path)):
+                continue
+            if self.config.should_index_file(file_path):
+                entries.append(entry)
+
+        return sorted(entries, key=lambda entry: entry.path)
+
+    def _entry_size(self, entry: os.DirEntry) -> int:
+        try:
+            return entry.stat().st_size
+        except OSError:
+            return 0
+
+    def _parse_timeout_micros(self) -> int:
+        timeout_ms = self.config.get_indexing_config().get("parseTimeoutMs") or 0
+        return max(0, int(timeout_ms * 1000))
 
     def _index_all_files(self) -> List[FileIndex]:
         """Index all eligible files in the project"""
-        indices = []
         self._index_cache.clear()
-        self._mtime_cache.clear()
+        self._stat_cache.clear()
+        self._hash_manifest.clear()
+        self._trees.clear()
+
+        file_paths = self._find_indexable_files()
+        pending = file_paths
+        if len(file_paths) >= PARALLEL_INDEX_MIN_FILES and (os.cpu_count() or 1) > 1:
+            # Only files missing from the persistent cache are worth shipping to workers
+            pending = [path for path in file_paths if not self._load_from_store(path)]
+            if len(pending) >= PARALLEL_INDEX_MIN_FILES:
+                try:
+                    self._index_files_parallel(pending)
+                    pending = []
+                except (OSError, BrokenProcessPool):
+                    # Process pools are unavailable in some sandboxes; parse serially
+                    pass
+
+        for file_path in pending:
+            self._update_cache_for_file(file_path)
+
+        relative_paths = [self._relative_path(file_path) for file_path in file_paths]
+        self._store.retain(relative_paths)
+        return [
+            self._index_cache[relative_path]
+            for relative_path in relative_paths
+            if relative_path in self._index_cache
+        ]
+
+    def _index_files_parallel(self, file_paths: List[Path]):
+        """Parse files across worker processes, one tree-sitter parser per worker
+
+        Processes rather than threads: extraction walks the tree in Python, and
+        the deadline-checking read callback keeps the parse itself under the GIL.
+        """
+        # No more workers than there are chunks to hand out
+        chunks = -(-len(file_paths) // PARALLEL_INDEX_CHUNKSIZE)
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, chunks), mp_context=_process_pool_context()
+        ) as executor:
+            results = executor.map(
+                _index_file_worker,
+                [str(file_path) for file_path in file_paths],
+                repeat(str(self.project_root)),
+                repeat(self._parse_timeout_micros()),
+                chunksize=PARALLEL_INDEX_CHUNKSIZE,
+            )
+            for file_path, stat_key, content_hash, index in results:
+                if index is None:
+                    continue
+                self._store_index(Path(file_path), stat_key, content_hash, index)
+                self._remember(index.path, stat_key, content_hash, index)
 
-        for file_path in self._find_indexable_files():
-            if self._update_cache_for_file(file_path):
-                index = self._index_cache.get(self._relative_path(file_path))
-                if index:
-                    indices.append(index)
+    def _load_from_store(self, file_path: Path) -> bool:
+        """Fill the in-memory cache from the persistent store; False if the file needs parsing"""
+        try:
+            relative_path = self._relative_path(file_path)
+            stat = file_path.stat()
+        except (ValueError, OSError):
+            return False
 
-        return indices
+        stat_key = _stat_key(stat)
+        cached = self._load_unchanged(relative_path, stat_key)
+        if cached is not None:
+            self._remember(relative_path, stat_key, *cached)
+            return True
+
+        try:
+            with _read_source(file_path, stat.st_size) as source:
+                content_hash = hash_content(source)
+        except OSError:
+            return False
+
+        index = self._load_index(file_path, relative_path, content_hash)
+        if index is None:
+            return False
+
+        # Touched, or content seen before; record the stat so the next run skips the read
+        self._store_index(file_path, stat_key, content_hash, index)
+        self._remember(relative_path, stat_key, content_hash, index)
+        return True
+
+    def _load_unchanged(
+        self, relative_path: str, stat_key: Tuple[int, int]
+    ) -> Optional[Tuple[bytes, FileIndex]]:
+        """(content hash, index) from the store if the file's stat matches its row"""
+        cached = self._store.get_unchanged(relative_path, *stat_key)
+        if cached is None:
+            return None
+        content_hash, rows = cached
+        index = self._index_from_rows(relative_path, rows)
+        return None if index is None else (content_hash, index)
+
+    def _load_index(
+        self, file_path: Path, relative_path: str, content_hash: bytes
+    ) -> Optional[FileIndex]:
+        """Index for content seen before at any path, from the content-addressed store"""
+        rows = self._store.get(content_hash, self._language_key(file_path))
+        if rows is None:
+            return None
+        return self._index_from_rows(relative_path, rows)
+
+    def _store_index(
+        self,
+        file_path: Path,
+        stat_key: Tuple[int, int],
+        content_hash: bytes,
+        index: FileIndex,
+    ):
+        self._store.put(
+            index.path,
+            *stat_key,
+            content_hash,
+            self._language_key(file_path),
+            _encode_exports(index.exports),
+        )
+
+    def _language_key(self, file_path: Path) -> str:
+        # The same bytes parse differently as TS and TSX, so cached exports are per grammar
+        return self.parser.get_language_for_file(file_path) or ""
+
+    def _index_from_rows(self, relative_path: str, rows: List[list]) -> Optional[FileIndex]:
+        try:
+            return FileIndex(path=relative_path, exports=_decode_exports(rows))
+        except TypeError:
+            return None
+
+    def _remember(
+        self,
+        relative_path: str,
+        stat_key: Tuple[int, int],
+        content_hash: bytes,
+        index: FileIndex,
+    ):
+        # Files without exports are only kept in the persistent store
+        if index.exports:
+            self._index_cache[relative_path] = index
+            self._stat_cache[relative_path] = stat_key
+            self._hash_manifest[relative_path] = content_hash
 
     def _find_indexable_files(self) -> List[Path]:
         """Find all files that should be indexed"""
-        indexable: Set[Path] = set()
-        extensions = [".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"]
-        indexing_config = self.config.get_indexing_config()
-        includes = indexing_config.get("include", [])
-
-        if includes:
-            for pattern in includes:
-                for file_path in self.project_root.glob(pattern):
-                    if (
-                        file_path.is_file()
-                        and file_path.suffix.lower() in extensions
-                        and self.config.should_index_file(file_path)
-                    ):
-                        indexable.add(file_path)
-            return sorted(indexable)
-
-        for ext in extensions:
-            for file_path in self.project_root.rglob(f"*{ext}"):
-                if self.config.should_index_file(file_path):
-                    indexable.add(file_path)
-
-        return sorted(indexable)
+        return [Path(entry.path) for entry in self.get_indexable_files()]
+
+    def _scandir_recursive(self, path: str) -> Iterator[os.DirEntry]:
+        """Yield file entries below path, skipping ignored directories before descending"""
+        matcher = self.config.get_ignore_matcher()
+        prune_names = self.config.get_indexing_prune_names()
+        root_prefix = self._root_prefix
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            name = entry.name
+                            if name in prune_names or matcher.should_prune_dir(name):
+                                continue
+                            # Path and .gitignore rules need the root-relative path
+                            relative_path = _relative_posix_path(entry.path, root_prefix)
+                            if not matcher.match(relative_path):
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+            except OSError:
+                continue
 
     def _relative_path(self, file_path: Path) -> str:
+        path_str = str(file_path)
+        if path_str.startswith(self._root_prefix):
+            return _relative_posix_path(path_str, self._root_prefix)
+        # Watcher events can name paths outside the root; relative_to raises ValueError
         return str(file_path.relative_to(self.project_root)).replace("\\", "/")
 
     def _update_for_change(
@@ -772,17 +1553,38 @@ class CodebaseIndexer:
             return
 
         if event_type in {"created", "modified"}:
-            self._update_cache_for_file(changed_path)
+            self._update_cache_for_file(changed_path, incremental=event_type == "modified")
 
     def _remove_from_cache(self, file_path: Path):
         try:
             relative_path = self._relative_path(file_path)
         except ValueError:
             return
+        self._forget(relative_path)
+        self._trees.discard(relative_path)
+
+    def _remove_directories(self, directories: Iterable[Path]):
+        """Drop every cached file below the given directories, in one pass over the cache"""
+        prefixes = []
+        for directory in directories:
+            try:
+                prefixes.append(self._relative_path(directory) + "/")
+            except ValueError:
+                continue
+        if not prefixes:
+            return
+
+        prefixes = tuple(prefixes)
+        for relative_path in [path for path in self._index_cache if path.startswith(prefixes)]:
+            self._forget(relative_path)
+        self._trees.discard_below(prefixes)
+
+    def _forget(self, relative_path: str):
         self._index_cache.pop(relative_path, None)
-        self._mtime_cache.pop(relative_path, None)
+        self._stat_cache.pop(relative_path, None)
+        self._hash_manifest.pop(relative_path, None)
 
-    def _update_cache_for_file(self, file_path: Path) -> bool:
+    def _update_cache_for_file(self, file_path: Path, incremental: bool = False) -> bool:
         if not file_path.exists():
             self._remove_from_cache(file_path)
             return False
@@ -793,48 +1595,64 @@ class CodebaseIndexer:
 
         try:
             relative_path = self._relative_path(file_path)
-            mtime = file_path.stat().st_mtime
+            stat = file_path.stat()
         except (ValueError, FileNotFoundError):
             return False
 
-        if self._mtime_cache.get(relative_path) == mtime:
+        # Oversized files are bundled or generated; keep them out of the index
+        max_file_bytes = self.config.get_indexing_config().get("maxFileBytes") or 0
+        if max_file_bytes > 0 and stat.st_size > max_file_bytes:
+            self._remove_from_cache(file_path)
+            return False
+
+        stat_key = _stat_key(stat)
+        if self._stat_cache.get(relative_path) == stat_key:
+            return False
+
+        cached = self._load_unchanged(relative_path, stat_key)
+        if cached is not None:
+            content_hash, index = cached
+        else:
+            try:
+                with _read_source(file_path, stat.st_size) as source:
+                    content_hash = hash_content(source)
+                    # Editors often rewrite identical bytes; keep the cached index then
+                    if self._hash_manifest.get(relative_path) == content_hash:
+                        index = self._index_cache.get(relative_path)
+                    else:
+                        index = self._load_index(file_path, relative_path, content_hash)
+                    if index is None:
+                        index = self._index_file(file_path, source, incremental)
+            except OSError:
+                return False
+
+            if index is not None:
+                self._store_index(file_path, stat_key, content_hash, index)
+
+        if (
+            relative_path in self._index_cache
+            and self._hash_manifest.get(relative_path) == content_hash
+        ):
+            self._stat_cache[relative_path] = stat_key
             return False
 
-        index = self._index_file(file_path)
         if index and index.exports:
-            self._index_cache[relative_path] = index
-            self._mtime_cache[relative_path] = mtime
+            self._remember(relative_path, stat_key, content_hash, index)
             return True
 
         self._remove_from_cache(file_path)
         return False
 
-    def _index_file(self, file_path: Path) -> Optional[FileIndex]:
-        """Index a single file"""
-        language = self.parser.get_language_for_file(file_path)
-        if not language:
-            return None
-
-        parser = self.parser.get_parser(language)
-        if not parser:
-            return None
-
-        try:
-            with open(file_path, "rb") as f:
-                source = f.read()
-
-            tree = parser.parse(source)
-            extractor = self.extractors.get(language)
-
-            if not extractor:
-                return None
-
-            exports = extractor.extract_exports(tree, source)
-            relative_path = str(file_path.relative_to(self.project_root)).replace(
-                "\\", "/"
-            )
-
-            return FileIndex(path=relative_path, exports=exports)
-
-        except Exception:
-            return None
+    def _index_file(
+        self, file_path: Path, source: bytes, incremental: bool = False
+    ) -> Optional[FileIndex]:
+        """Index a single file from its source bytes, reusing its last tree if incremental"""
+        return _parse_file(
+            self.parser,
+            self.extractor,
+            file_path,
+            self._relative_path(file_path),
+            source,
+            self._parse_timeout_micros(),
+            self._trees if incremental else None,
+        )
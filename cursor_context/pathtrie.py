@@ -0,0 +1,88 @@
+"""
+Path Trie - Literal .gitignore rules as a per-segment trie.
+A lookup walks the path's components once, however many rules there are.
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Rules using wildmatch, escapes or negation stay with pathspec, as do directory-only
+# rules ('build/'): the trie can't tell a directory from a file of the same name
+_NON_LITERAL_CHARS = frozenset('*?[]\\!')
+
+
+class PathTrie:
+    """Bare names match any path component; anchored paths match themselves and everything below"""
+
+    __slots__ = ('names', 'root')
+
+    def __init__(self):
+        self.names = set()
+        # segment -> child node, or True once the prefix so far is itself a rule
+        self.root = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.root)
+
+    def insert(self, segments: Sequence[str], anchored: bool):
+        if not anchored and len(segments) == 1:
+            self.names.add(segments[0])
+            return
+
+        node = self.root
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if child is True:
+                # A parent directory is already ignored
+                return
+            if child is None:
+                child = node[segment] = {}
+            node = child
+        node[segments[-1]] = True
+
+    def match(self, segments: Sequence[str]) -> bool:
+        if self.names and not self.names.isdisjoint(segments):
+            return True
+
+        node = self.root
+        for segment in segments:
+            node = node.get(segment)
+            if node is None:
+                return False
+            if node is True:
+                return True
+        return False
+
+
+def partition_gitignore_lines(lines: Iterable[str]) -> Tuple[PathTrie, List[str]]:
+    """Split .gitignore lines into a trie of literal rules and the lines pathspec must handle
+
+    A '!' rule makes rule order significant, so then every line stays with pathspec.
+    """
+    lines = list(lines)
+    trie = PathTrie()
+    if any(line.startswith('!') for line in lines):
+        return trie, lines
+
+    remaining = []
+    for line in lines:
+        rule = _literal_rule(line)
+        if rule is None:
+            remaining.append(line)
+        else:
+            trie.insert(*rule)
+    return trie, remaining
+
+
+def _literal_rule(line: str) -> Optional[Tuple[List[str], bool]]:
+    """(segments, anchored) for a plain path rule, None if it needs pathspec"""
+    if not line or line != line.strip() or line.startswith('#') or line.endswith('/'):
+        return None
+    if not _NON_LITERAL_CHARS.isdisjoint(line):
+        return None
+
+    # A slash anywhere anchors the rule to the root
+    anchored = '/' in line
+    segments = line.lstrip('/').split('/')
+    if any(segment in ('', '.', '..') for segment in segments):
+        return None
+    return segments, anchored
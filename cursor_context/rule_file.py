@@ -0,0 +1,45 @@
+"""
+Rule File - Streams generated .mdc rule files to disk.
+Output lines are written as they are produced instead of being joined into one string first,
+into a temporary file that then replaces the rule file, so readers never see a partial write.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def split_template(template: str, placeholder: str, **fields: str) -> Tuple[str, str]:
+    """Split a template around {placeholder} and fill the remaining fields in each half"""
+    head, _, tail = template.partition("{" + placeholder + "}")
+    return head.format(**fields), tail.format(**fields)
+
+
+def write_rule_file(output_file: Path, head: str, lines: Iterable[str], tail: str):
+    """Write head, then lines joined by newlines, then tail, and swap the result into place"""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    # Dot-prefixed so the structure scan, which may be writing it, never lists it
+    temp_file = output_file.with_name(f".{output_file.name}.tmp")
+
+    try:
+        with open(temp_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(head)
+            f.writelines(_join_lines(lines))
+            f.write(tail)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+        raise
+
+
+def _join_lines(lines: Iterable[str]) -> Iterator[str]:
+    separator = ""
+    for line in lines:
+        yield separator
+        yield line
+        separator = "\n"
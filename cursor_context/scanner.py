@@ -1,6 +1,7 @@
-from pathlib import Path
-from typing import Dict, List
-from .config import Config
+import os
+from typing import Iterator
+from .config import Config, IgnoreMatcher
+from .rule_file import split_template, write_rule_file
 from importlib import resources
 
 class DirectoryScanner:
@@ -8,81 +9,72 @@ class DirectoryScanner:
         self.config = config
         self.project_root = config.project_root
         self.output_file = self.project_root / '.cursor' / 'rules' / 'file-structure.mdc'
+        self.total_dirs = 0
+        self.total_files = 0
     
-    def scan_directory(self) -> Dict:
-        structure = {'items': [], 'total_dirs': 0, 'total_files': 0}
+    def generate_lines(self, format_type: str) -> Iterator[str]:
+        """Walk the tree depth-first with an explicit stack, yielding output lines as it goes"""
+        matcher = self.config.get_ignore_matcher()
+        xml = format_type == 'xml'
+        self.total_dirs = 0
+        self.total_files = 0
         
-        def scan_recursive(path: Path, level: int = 0) -> List[Dict]:
-            items = []
+        # Entries are (path, name, level, is_last, is_dir); plain strings are deferred closing tags
+        stack = []
+        self._push_children(stack, str(self.project_root), 0, matcher)
+        
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
             
-            try:
-                all_items = list(path.iterdir())
-                directories = self._filter_directories(all_items)
-                files = self._filter_files(all_items)
-                
-                items.extend(self._process_directories(directories, level, structure, scan_recursive))
-                items.extend(self._process_files(files, level, structure))
-                
-            except PermissionError:
-                pass
+            path, name, level, is_last, is_dir = item
+            if xml:
+                indent = "  " * level
+                if is_dir:
+                    yield f"{indent}<directory name=\"{name}\">"
+                    stack.append(f"{indent}</directory>")
+                else:
+                    yield f"{indent}<file name=\"{name}\"/>"
+            else:
+                prefix = self._get_tree_prefix(level, is_last)
+                yield f"{prefix}{name}/" if is_dir else f"{prefix}{name}"
             
-            return items
-        
-        structure['items'] = scan_recursive(self.project_root)
-        return structure
-    
-    def _filter_directories(self, items):
-        directories = [item for item in items if item.is_dir() and not self.config.should_ignore(item)]
-        return sorted(directories, key=lambda x: x.name.lower())
-    
-    def _filter_files(self, items):
-        files = [item for item in items if item.is_file() and not item.name.startswith('.')]
-        return sorted(files, key=lambda x: x.name.lower())
-    
-    def _process_directories(self, directories, level, structure, scan_recursive):
-        items = []
-        for directory in directories:
-            dir_info = {
-                'type': 'directory',
-                'name': directory.name,
-                'path': str(directory.relative_to(self.project_root)),
-                'level': level,
-                'children': scan_recursive(directory, level + 1)
-            }
-            items.append(dir_info)
-            structure['total_dirs'] += 1
-        return items
-    
-    def _process_files(self, files, level, structure):
-        items = []
-        for file in files:
-            file_info = {
-                'type': 'file',
-                'name': file.name,
-                'path': str(file.relative_to(self.project_root)),
-                'level': level,
-                'extension': file.suffix.lower() if file.suffix else None
-            }
-            items.append(file_info)
-            structure['total_files'] += 1
-        return items
+            if is_dir:
+                self.total_dirs += 1
+                self._push_children(stack, path, level + 1, matcher)
+            else:
+                self.total_files += 1
     
-    def generate_tree_structure(self, items: List[Dict], level: int = 0) -> List[str]:
-        lines = []
+    def _push_children(self, stack, path: str, level: int, matcher: IgnoreMatcher):
+        """Push a directory's visible children, directories first, so they pop in display order"""
+        try:
+            with os.scandir(path) as it:
+                directories, files = self._partition_entries(it, matcher)
+        except PermissionError:
+            return
         
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
-            prefix = self._get_tree_prefix(level, is_last)
-            
-            if item['type'] == 'directory':
-                lines.append(f"{prefix}{item['name']}/")
-                if item.get('children'):
-                    child_lines = self.generate_tree_structure(item['children'], level + 1)
-                    lines.extend(child_lines)
-            else:
-                lines.append(f"{prefix}{item['name']}")
+        children = directories + files
+        last = len(children) - 1
+        for i in range(last, -1, -1):
+            entry = children[i]
+            stack.append((entry.path, entry.name, level, i == last, i < len(directories)))
+    
+    def _partition_entries(self, entries, matcher: IgnoreMatcher):
+        """Split scandir entries into visible directories and files in one pass, using cached d_type"""
+        directories, files = [], []
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir():
+                if not matcher.should_prune_dir(name) and not matcher.should_ignore(entry.path):
+                    directories.append(entry)
+            elif entry.is_file() and not name.startswith('.'):
+                files.append(entry)
         
-        return lines
+        directories.sort(key=lambda x: x.name.lower())
+        files.sort(key=lambda x: x.name.lower())
+        return directories, files
     
     def _get_tree_prefix(self, level, is_last):
         if level == 0:
@@ -91,18 +83,13 @@ class DirectoryScanner:
         prefix = "  " * (level - 1)
         return prefix + ("└── " if is_last else "├── ")
     
-    def generate_cursor_rule(self, structure: Dict) -> str:
+    def _rule_parts(self):
+        """Template text before and after the tree, plus the lazily generated tree lines"""
         project_name = self.project_root.name
         
         config = self.config.load()
         format_type = config.get('structure', {}).get('format', 'xml')
         
-        if format_type == 'xml':
-            tree_content = self.generate_xml_structure(structure['items'])
-        else:
-            tree_lines = self.generate_tree_structure(structure['items'])
-            tree_content = "\n".join(tree_lines)
-        
         try:
             template = resources.files('cursor_context').joinpath('templates/file-structure.mdc.template').read_text(encoding='utf-8')
         except FileNotFoundError:
@@ -112,34 +99,11 @@ class DirectoryScanner:
                 "```\n{project_name}/\n{tree_content}\n```\n"
             )
         
-        return template.format(
-            project_name=project_name,
-            tree_content=tree_content
-        )
-    
-    def generate_xml_structure(self, items: List[Dict], level: int = 0) -> str:
-        lines = []
-        indent = "  " * level
-        
-        for item in items:
-            if item['type'] == 'directory':
-                lines.append(f"{indent}<directory name=\"{item['name']}\">")
-                if item.get('children'):
-                    child_content = self.generate_xml_structure(item['children'], level + 1)
-                    lines.append(child_content)
-                lines.append(f"{indent}</directory>")
-            else:
-                lines.append(f"{indent}<file name=\"{item['name']}\"/>")
-        
-        return '\n'.join(lines)
+        head, tail = split_template(template, 'tree_content', project_name=project_name)
+        return head, self.generate_lines(format_type), tail
     
     def scan_and_generate(self):
-        self.output_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        structure = self.scan_directory()
-        rule_content = self.generate_cursor_rule(structure)
-        
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write(rule_content)
+        head, lines, tail = self._rule_parts()
+        write_rule_file(self.output_file, head, lines, tail)
         
         return self.output_file
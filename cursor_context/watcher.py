@@ -1,10 +1,54 @@
+import os
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirModifiedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+    FileSystemEventHandler,
+)
 from .config import Config
 from .scanner import DirectoryScanner
-from colorama import Fore, Style
+from .colors import Fore, Style
+
+# Trailing-edge debounce: regenerate once a burst of events goes quiet for a whole
+# window, but never hold a change back longer than the max delay during a continuous stream
+DEBOUNCE_SECONDS = 0.25
+MAX_DEBOUNCE_DELAY_SECONDS = 0.5
+
+# Event paths whose verdicts are remembered, least recently used dropped first
+CLASSIFICATION_CACHE_SIZE = 16384
+
+# Verdict bits: which outputs an event path should update
+STRUCTURE_UPDATE = 1
+INDEX_UPDATE = 2
+
+# The events the handler acts on; the rest (opened, closed) are never subscribed,
+# so reads during installs and builds don't reach Python at all
+WATCHED_EVENTS = [
+    FileCreatedEvent, DirCreatedEvent,
+    FileDeletedEvent, DirDeletedEvent,
+    FileModifiedEvent, DirModifiedEvent,
+    FileMovedEvent, DirMovedEvent,
+]
+
+# Queued index events store their type as an index into this tuple
+_EVENT_TYPES = ('created', 'modified', 'deleted', 'moved', 'deleted_directory')
+_EVENT_CODES = {event_type: code for code, event_type in enumerate(_EVENT_TYPES)}
+
+# Editor swap/backup and download files that never change the structure
+_TEMP_FILE_RE = re.compile(r'(?:\.tmp|\.temp|~|\.swp|\.swo)\Z')
+_VISIBLE_DOTFILES = frozenset({'.gitignore', '.env', '.env.local'})
 
 
 class CursorContextHandler(FileSystemEventHandler):
@@ -20,138 +64,278 @@ class CursorContextHandler(FileSystemEventHandler):
             from .indexer import CodebaseIndexer
             self.indexer = CodebaseIndexer(config)
 
-        # Separate debounce timers
-        self.last_structure_update = 0
-        self.last_index_update = 0
-        self.update_delay = 1.0
+        # Pending work per output; debounce timers hand each flush to that output's
+        # single worker, so regeneration never blocks event dispatch and never overlaps
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._burst_started = {}
+        # Outputs that saw events since their timer was last armed
+        self._active = set()
+        self._pending_structure = None
+        # Queued index events as parallel buffers (path, type code, moved-from path),
+        # appended per event and swapped out whole by the flush
+        self._pending_paths = []
+        self._pending_kinds = bytearray()
+        self._pending_sources = []
+        self._executors = {
+            kind: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'twiggy-{kind}')
+            for kind in ('structure', 'index')
+        }
 
         # File extensions that trigger index updates
-        self.indexable_extensions = {'.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs'}
-
-    def should_trigger_structure_update(self, event_path: str) -> bool:
-        """Check if event should trigger file structure update"""
-        path = Path(event_path)
+        self.indexable_extensions = frozenset({'.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs'})
+
+        # Verdict bits per event path, so repeat events (editors saving the same files,
+        # node_modules installs) skip the filter checks for both outputs at once
+        self._classify = lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)(self._classify_path)
+        # Either file changing can flip a remembered verdict
+        self._filter_files = {str(config.config_file), str(config.gitignore_file)}
+
+        # Bare-name ignores (node_modules, .git, ...) reject an event for both outputs
+        # whatever else its path holds, so such events are dropped on a string split
+        self._root_prefix = str(config.project_root) + os.sep
+        self._ignored_names = config.get_ignore_matcher().names
+
+    def dispatch(self, event):
+        # Keeps bursts under nested ignored directories out of the verdict caches
+        if self._is_ignored_path(event.src_path) and (
+            not getattr(event, 'dest_path', '') or self._is_ignored_path(event.dest_path)
+        ):
+            return
+        super().dispatch(event)
 
-        if self.config.should_ignore(path):
+    def _is_ignored_path(self, event_path: str) -> bool:
+        if not event_path.startswith(self._root_prefix):
             return False
+        relative_parts = event_path[len(self._root_prefix):].split(os.sep)
+        return not self._ignored_names.isdisjoint(relative_parts)
 
-        if '.cursor' in path.parts:
-            return False
+    def on_any_event(self, event):
+        if (event.src_path in self._filter_files or
+                getattr(event, 'dest_path', '') in self._filter_files):
+            self._classify.cache_clear()
+            self._ignored_names = self.config.get_ignore_matcher().names
 
-        if self._is_temporary_file(path):
-            return False
-
-        return True
+    def should_trigger_structure_update(self, event_path: str) -> bool:
+        """Check if event should trigger file structure update"""
+        return bool(self._classify(event_path) & STRUCTURE_UPDATE)
 
     def should_trigger_index_update(self, event_path: str) -> bool:
         """Check if event should trigger codebase index update"""
-        if not self.indexing_enabled or not self.indexer:
-            return False
+        return bool(self._classify(event_path) & INDEX_UPDATE)
 
-        path = Path(event_path)
+    def _classify_path(self, event_path: str) -> int:
+        """Run the structure and index checks in one pass, returning the verdict bits"""
+        verdict = 0
 
-        # Only index supported file types
-        if path.suffix.lower() not in self.indexable_extensions:
-            return False
+        # Cheap name checks before the ignore rules; all of them work on the raw string
+        if (not self._is_temporary_file(os.path.basename(event_path)) and
+                '.cursor' not in event_path.split(os.sep) and
+                not self.config.should_ignore(event_path)):
+            verdict |= STRUCTURE_UPDATE
 
-        # Check against indexing filters
-        if not self.config.should_index_file(path):
-            return False
+        # Only index supported file types, then check against indexing filters
+        if (self.indexing_enabled and self.indexer and
+                os.path.splitext(event_path)[1].lower() in self.indexable_extensions and
+                self.config.should_index_file(event_path)):
+            verdict |= INDEX_UPDATE
 
-        return True
+        return verdict
 
-    def _is_temporary_file(self, path):
-        if path.name.startswith('.') and path.name not in ['.gitignore', '.env', '.env.local']:
+    def _is_temporary_file(self, name: str) -> bool:
+        if name.startswith('.') and name not in _VISIBLE_DOTFILES:
             return True
 
-        temp_patterns = ['.tmp', '.temp', '~', '.swp', '.swo']
-        return any(path.name.endswith(pattern) for pattern in temp_patterns)
+        return _TEMP_FILE_RE.search(name) is not None
 
     def update_structure(self, event_type: str, path: str):
-        """Update the file structure output"""
-        current_time = time.time()
+        """Schedule a file structure update for the end of the current burst"""
+        with self._lock:
+            self._pending_structure = (event_type, path)
+            self._schedule('structure', self._flush_structure)
 
-        if current_time - self.last_structure_update < self.update_delay:
+    def update_index(self, event_type: str, path: str, src_path: str = None):
+        """Queue a changed file and schedule a codebase index update for the end of the burst"""
+        with self._lock:
+            self._pending_paths.append(path)
+            self._pending_kinds.append(_EVENT_CODES[event_type])
+            self._pending_sources.append(src_path)
+            self._schedule('index', self._flush_index)
+
+    def _schedule(self, kind: str, flush):
+        """Arm kind's debounce timer, or just mark it active if it is armed already
+
+        Events in the middle of a burst cost a set add: no clock read, no new timer
+        thread. The caller holds self._lock.
+        """
+        if kind in self._timers:
+            self._active.add(kind)
             return
 
-        self.last_structure_update = current_time
+        self._burst_started[kind] = time.monotonic()
+        self._arm(kind, flush, DEBOUNCE_SECONDS)
+
+    def _arm(self, kind: str, flush, delay: float):
+        timer = self._timers[kind] = threading.Timer(delay, partial(self._on_timer, kind, flush))
+        timer.daemon = True
+        timer.start()
+
+    def _on_timer(self, kind: str, flush):
+        """Re-arm while events keep arriving, up to the max delay; otherwise queue the flush"""
+        with self._lock:
+            if kind not in self._timers:
+                # Cancelled by shutdown while firing
+                return
+
+            if kind in self._active:
+                self._active.discard(kind)
+                remaining = self._burst_started[kind] + MAX_DEBOUNCE_DELAY_SECONDS - time.monotonic()
+                if remaining > 0:
+                    self._arm(kind, flush, min(DEBOUNCE_SECONDS, remaining))
+                    return
+
+            # End the burst; events arriving meanwhile join the queued flush
+            del self._timers[kind]
+            self._burst_started.pop(kind, None)
+            try:
+                self._executors[kind].submit(flush)
+            except RuntimeError:
+                # Shut down while the timer was firing
+                pass
+
+    def shutdown(self):
+        """Drop bursts still debouncing and wait for running regenerations to finish"""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._burst_started.clear()
+            self._active.clear()
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def _flush_structure(self):
+        with self._lock:
+            pending, self._pending_structure = self._pending_structure, None
+
+        if pending is None:
+            return
 
+        event_type, path = pending
         try:
             self.scanner.scan_and_generate()
             print(f"{Fore.GREEN}Updated structure ({event_type}): {Path(path).name}{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}Error updating structure: {e}{Style.RESET_ALL}")
 
-    def update_index(self, event_type: str, path: str, src_path: str = None):
-        """Update the codebase index output"""
-        current_time = time.time()
+    def _flush_index(self):
+        with self._lock:
+            paths, self._pending_paths = self._pending_paths, []
+            kinds, self._pending_kinds = self._pending_kinds, bytearray()
+            sources, self._pending_sources = self._pending_sources, []
 
-        if current_time - self.last_index_update < self.update_delay:
+        if not paths:
             return
 
-        self.last_index_update = current_time
+        # Only the latest event per path matters; scan backwards so it is the one kept
+        latest = {}
+        for i in range(len(paths) - 1, -1, -1):
+            latest.setdefault(paths[i], i)
+
+        changes = {}
+        # A move superseded by a later event on its destination still has to drop its
+        # source, unless the source path has events of its own
+        for i, src_path in enumerate(sources):
+            if src_path and latest[paths[i]] != i and src_path not in latest:
+                changes[Path(src_path)] = ('deleted', None)
+
+        for i in sorted(latest.values()):
+            src_path = sources[i]
+            changes[Path(paths[i])] = (_EVENT_TYPES[kinds[i]], Path(src_path) if src_path else None)
 
         try:
-            self.indexer.index_and_generate(
-                changed_path=Path(path),
-                event_type=event_type,
-                src_path=Path(src_path) if src_path else None,
-            )
-            print(f"{Fore.BLUE}Updated index ({event_type}): {Path(path).name}{Style.RESET_ALL}")
+            # One regeneration for the whole burst
+            self.indexer.index_and_generate_batch(changes)
+            if len(changes) == 1:
+                path, (event_type, _) = next(iter(changes.items()))
+                print(f"{Fore.BLUE}Updated index ({event_type}): {path.name}{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.BLUE}Updated index ({len(changes)} files){Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}Error updating index: {e}{Style.RESET_ALL}")
 
     def on_created(self, event):
-        if event.is_directory:
-            if self.should_trigger_structure_update(event.src_path):
-                self.update_structure("created", event.src_path)
-        else:
-            if self.should_trigger_structure_update(event.src_path):
-                self.update_structure("created", event.src_path)
-            if self.should_trigger_index_update(event.src_path):
-                self.update_index("created", event.src_path)
+        verdict = self._classify(event.src_path)
+        if verdict & STRUCTURE_UPDATE:
+            self.update_structure("created", event.src_path)
+        if verdict & INDEX_UPDATE and not event.is_directory:
+            self.update_index("created", event.src_path)
 
     def on_deleted(self, event):
+        verdict = self._classify(event.src_path)
+        if verdict & STRUCTURE_UPDATE:
+            self.update_structure("deleted", event.src_path)
         if event.is_directory:
-            if self.should_trigger_structure_update(event.src_path):
-                self.update_structure("deleted", event.src_path)
-        else:
-            if self.should_trigger_structure_update(event.src_path):
-                self.update_structure("deleted", event.src_path)
-            if self.should_trigger_index_update(event.src_path):
-                self.update_index("deleted", event.src_path)
+            self._remove_indexed_directory(event.src_path)
+        elif verdict & INDEX_UPDATE:
+            self.update_index("deleted", event.src_path)
 
     def on_moved(self, event):
-        should_update_structure = (
-            self.should_trigger_structure_update(event.src_path) or
-            self.should_trigger_structure_update(event.dest_path)
-        )
-        should_update_index = (
-            self.should_trigger_index_update(event.src_path) or
-            self.should_trigger_index_update(event.dest_path)
-        )
-
-        if should_update_structure:
+        # Either end of the move can make it relevant to an output
+        verdict = self._classify(event.src_path) | self._classify(event.dest_path)
+        if verdict & STRUCTURE_UPDATE:
             self.update_structure("moved", event.dest_path)
-        if should_update_index:
+        if event.is_directory:
+            # Files now under dest_path arrive as their own events, or are replayed
+            # when the directory gets a watch of its own
+            self._remove_indexed_directory(event.src_path)
+        elif verdict & INDEX_UPDATE:
             self.update_index("moved", event.dest_path, event.src_path)
 
+    def _remove_indexed_directory(self, path: str):
+        # A watch on the root alone reports no per-file events when a top-level
+        # directory is renamed, so the files indexed below it are dropped by prefix
+        if self.indexing_enabled and self.indexer:
+            self.update_index("deleted_directory", path)
+
     def on_modified(self, event):
+        verdict = self._classify(event.src_path)
         if event.is_directory:
             # Directory modified - only update structure
-            if self.should_trigger_structure_update(event.src_path):
+            if verdict & STRUCTURE_UPDATE:
                 self.update_structure("modified", event.src_path)
         else:
             # File content changed - update index (not structure, since file list didn't change)
-            if self.should_trigger_index_update(event.src_path):
+            if verdict & INDEX_UPDATE:
                 self.update_index("modified", event.src_path)
 
 
+class _WatchPlanner(FileSystemEventHandler):
+    """Re-plans the watches when a top-level directory or an ignore file changes"""
+
+    def __init__(self, watcher: 'FileWatcher'):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        watcher = self.watcher
+        paths = (event.src_path, getattr(event, 'dest_path', ''))
+        if any(path in watcher.handler._filter_files for path in paths):
+            watcher._sync_watches()
+        elif event.is_directory and event.event_type != 'modified' and any(
+            path and os.path.dirname(path) == watcher.root for path in paths
+        ):
+            watcher._sync_watches()
+
+
 class FileWatcher:
     def __init__(self, config: Config):
         self.config = config
         self.observer = Observer()
         self.handler = CursorContextHandler(config)
+        self.root = str(config.project_root)
+        # (path, recursive) -> scheduled watch
+        self._watches = {}
+        self._planner = _WatchPlanner(self)
 
     def start(self):
         self._generate_initial_outputs()
@@ -160,25 +344,78 @@ class FileWatcher:
 
     def _generate_initial_outputs(self):
         """Generate both structure and index on startup"""
-        scanner = DirectoryScanner(self.config)
-        scanner.scan_and_generate()
+        self.handler.scanner.scan_and_generate()
         print(f"{Fore.CYAN}Initial structure generated{Style.RESET_ALL}")
 
-        indexing_config = self.config.get_indexing_config()
-        if indexing_config['enabled']:
-            from .indexer import CodebaseIndexer
-            indexer = CodebaseIndexer(self.config)
-            indexer.index_and_generate()
+        # The handler's own indexer, so later events update this warm index incrementally;
+        # files unchanged since the last run come from the on-disk cache without parsing
+        if self.handler.indexer is not None:
+            self.handler.indexer.index_and_generate()
             print(f"{Fore.CYAN}Initial codebase index generated{Style.RESET_ALL}")
 
     def _setup_observer(self):
-        self.observer.schedule(
-            self.handler,
-            str(self.config.project_root),
-            recursive=True
-        )
+        self._sync_watches()
         self.observer.start()
 
+    def _planned_watches(self):
+        """The whole tree, or, when ignores rule out top-level directories (node_modules,
+        .git, build output), the root alone plus each top-level directory they keep"""
+        matcher = self.config.get_ignore_matcher()
+        kept, skipped = [], False
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if matcher.should_prune_dir(entry.name) or matcher.should_ignore(entry.path):
+                        skipped = True
+                    else:
+                        kept.append(entry.path)
+        except OSError:
+            skipped = False
+
+        if not skipped:
+            return {(self.root, True)}
+        return {(self.root, False)} | {(path, True) for path in kept}
+
+    def _sync_watches(self):
+        """Schedule planned watches that are missing, then drop the ones no longer planned"""
+        planned = self._planned_watches()
+        # Directories the recursive root watch already covered have nothing to replay;
+        # the plan switching to per-directory watches doesn't mean their files are new
+        replay = self.observer.is_alive() and (self.root, True) not in self._watches
+
+        for key in planned:
+            if key in self._watches:
+                continue
+            path, recursive = key
+            try:
+                watch = self.observer.schedule(
+                    self.handler, path, recursive=recursive, event_filter=WATCHED_EVENTS
+                )
+            except OSError:
+                # Gone again before it could be watched
+                continue
+            if path == self.root:
+                self.observer.add_handler_for_watch(self._planner, watch)
+            elif replay:
+                # Files created along with the directory predate its watch
+                self._replay_created_files(path)
+            self._watches[key] = watch
+
+        for key in [key for key in self._watches if key not in planned]:
+            try:
+                self.observer.unschedule(self._watches.pop(key))
+            except KeyError:
+                pass
+
+    def _replay_created_files(self, path: str):
+        matcher = self.config.get_ignore_matcher()
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [name for name in dirnames if not matcher.should_prune_dir(name)]
+            for name in filenames:
+                self.handler.dispatch(FileCreatedEvent(os.path.join(dirpath, name)))
+
     def _run_watcher(self):
         try:
             while True:
@@ -189,4 +426,7 @@ class FileWatcher:
     def stop(self):
         self.observer.stop()
         self.observer.join()
+        self.handler.shutdown()
+        if self.handler.indexer is not None:
+            self.handler.indexer.close()
         print(f"{Fore.YELLOW}File watcher stopped{Style.RESET_ALL}")
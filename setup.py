@@ -15,9 +15,11 @@ setup(
     },
     install_requires=[
         "click>=8.0.0",
-        "watchdog>=3.0.0",
-        "colorama>=0.4.0",
+        "watchdog>=4.0.0",
+        "colorama>=0.4.6",
         "pyyaml>=6.0",
+        "pathspec>=0.10.0",
+        "xxhash>=3.0.0",
         "tree-sitter>=0.23.0",
         "tree-sitter-typescript>=0.23.0",
         "tree-sitter-javascript>=0.23.0",